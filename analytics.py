@@ -0,0 +1,198 @@
+import csv
+import json
+import os
+import sys
+import time
+from array import array
+from itertools import repeat
+
+
+COLUMNS = (
+    ("starts", "d", "starts.f64"),
+    ("durations", "f", "durations.f32"),
+    ("game_ids", "H", "games.u16"),
+    ("station_ids", "H", "stations.u16"),
+    ("reason_ids", "B", "reasons.u8"),
+)
+NAMES_FILE = "names.json"
+PERIODS = ("day", "week")
+
+
+class SessionHistory:
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.starts = array("d")
+        self.durations = array("f")
+        self.game_ids = array("H")
+        self.station_ids = array("H")
+        self.reason_ids = array("B")
+        self.games = []
+        self.stations = []
+        self.reasons = []
+        self._lookup = {"games": {}, "stations": {}, "reasons": {}}
+        if directory:
+            self.load()
+
+    def __len__(self):
+        return len(self.starts)
+
+    def _intern(self, kind, value):
+        ids = self._lookup[kind]
+        key = ids.get(value)
+        if key is None:
+            names = getattr(self, kind)
+            key = len(names)
+            names.append(value)
+            ids[value] = key
+            return key, True
+        return key, False
+
+    def load(self):
+        try:
+            with open(os.path.join(self.directory, NAMES_FILE), "r", encoding="utf-8") as f:
+                names = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError, OSError):
+            return
+        if not isinstance(names, dict):
+            return
+        for kind in ("games", "stations", "reasons"):
+            for value in names.get(kind, []):
+                self._intern(kind, str(value))
+        swap = names.get("byteorder", sys.byteorder) != sys.byteorder
+
+        columns = []
+        for attr, typecode, filename in COLUMNS:
+            column = array(typecode)
+            try:
+                with open(os.path.join(self.directory, filename), "rb") as f:
+                    data = f.read()
+            except OSError:
+                data = b""
+            column.frombytes(data[: len(data) - len(data) % column.itemsize])
+            if swap:
+                column.byteswap()
+            columns.append(column)
+        count = min(len(column) for column in columns)
+        for (attr, _typecode, filename), column in zip(COLUMNS, columns):
+            # A write torn between columns leaves some files a row ahead.
+            # Cut them back on disk too, or the next append would pair the
+            # orphaned values with the new row.
+            del column[count:]
+            if self._file_size(filename) != count * column.itemsize:
+                try:
+                    os.truncate(os.path.join(self.directory, filename), count * column.itemsize)
+                except OSError:
+                    pass
+            setattr(self, attr, column)
+
+    def _file_size(self, filename):
+        try:
+            return os.path.getsize(os.path.join(self.directory, filename))
+        except OSError:
+            return 0
+
+    def _save_names(self):
+        payload = {
+            "byteorder": sys.byteorder,
+            "games": self.games,
+            "stations": self.stations,
+            "reasons": self.reasons,
+        }
+        path = os.path.join(self.directory, NAMES_FILE)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=True)
+        os.replace(temp_path, path)
+
+    def append(self, start_ts, duration, game, station, reason):
+        game_id, new_game = self._intern("games", game)
+        station_id, new_station = self._intern("stations", station)
+        reason_id, new_reason = self._intern("reasons", reason)
+        values = (float(start_ts), max(0.0, float(duration)), game_id, station_id, reason_id)
+        for (attr, _typecode, _filename), value in zip(COLUMNS, values):
+            getattr(self, attr).append(value)
+
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        if new_game or new_station or new_reason or not os.path.exists(
+            os.path.join(self.directory, NAMES_FILE)
+        ):
+            self._save_names()
+        for (attr, typecode, filename), value in zip(COLUMNS, values):
+            with open(os.path.join(self.directory, filename), "ab") as f:
+                f.write(array(typecode, [value]).tobytes())
+
+    def merge(self, other):
+        game_map = [self._intern("games", name)[0] for name in other.games]
+        station_map = [self._intern("stations", name)[0] for name in other.stations]
+        reason_map = [self._intern("reasons", name)[0] for name in other.reasons]
+        self.starts.extend(other.starts)
+        self.durations.extend(other.durations)
+        self.game_ids.extend(array("H", map(game_map.__getitem__, other.game_ids)))
+        self.station_ids.extend(array("H", map(station_map.__getitem__, other.station_ids)))
+        self.reason_ids.extend(array("B", map(reason_map.__getitem__, other.reason_ids)))
+
+    def _period_bounds(self, ts, period):
+        t = time.localtime(ts)
+        day = t.tm_mday - (t.tm_wday if period == "week" else 0)
+        length = 7 if period == "week" else 1
+        lo = time.mktime((t.tm_year, t.tm_mon, day, 0, 0, 0, 0, 0, -1))
+        hi = time.mktime((t.tm_year, t.tm_mon, day + length, 0, 0, 0, 0, 0, -1))
+        fmt = "%G-W%V" if period == "week" else "%Y-%m-%d"
+        return lo, hi, time.strftime(fmt, time.localtime(lo))
+
+    def aggregate(self, period="day", by_station=True, since=None, until=None):
+        if period not in PERIODS:
+            raise ValueError(f"Unknown period: {period}")
+
+        # Sessions are appended in time order, so the current period's bounds
+        # are only recomputed when a start falls outside them. Totals go into
+        # flat arrays laid out as [period][station][game].
+        game_count = max(1, len(self.games))
+        width = game_count * (max(1, len(self.stations)) if by_station else 1)
+        station_ids = self.station_ids if by_station else repeat(0)
+        slots = {}
+        counts = array("L")
+        seconds = array("d")
+        lo = hi = None
+        base = 0
+        for start, duration, game_id, station_id in zip(
+            self.starts, self.durations, self.game_ids, station_ids
+        ):
+            if since is not None and start < since:
+                continue
+            if until is not None and start >= until:
+                continue
+            if lo is None or not (lo <= start < hi):
+                lo, hi, label = self._period_bounds(start, period)
+                base = slots.get(label)
+                if base is None:
+                    base = len(counts)
+                    slots[label] = base
+                    counts.extend(repeat(0, width))
+                    seconds.extend(repeat(0.0, width))
+            idx = base + station_id * game_count + game_id
+            counts[idx] += 1
+            seconds[idx] += duration
+
+        rows = []
+        for label, base in slots.items():
+            for offset in range(width):
+                count = counts[base + offset]
+                if not count:
+                    continue
+                station_id, game_id = divmod(offset, game_count)
+                station = self.stations[station_id] if by_station else ""
+                rows.append((label, station, self.games[game_id], count, seconds[base + offset]))
+        rows.sort()
+        return rows
+
+    def export_csv(self, path, period="day", by_station=True, since=None, until=None):
+        rows = self.aggregate(period, by_station, since, until)
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow([period, "station", "game", "sessions", "minutes"])
+            for label, station, game, count, seconds in rows:
+                writer.writerow([label, station, game, count, f"{seconds / 60:.2f}"])
+        return len(rows)
@@ -1,8 +1,15 @@
+import argparse
 import os
 import sys
 import time
 import json
-import subprocess
+
+# Headless mode must not pay for loading Tk, so dispatch before importing it.
+if __name__ == "__main__" and "--headless" in sys.argv[1:]:
+    import headless
+
+    sys.exit(headless.main(sys.argv[1:]))
+
 import tkinter as tk
 import tkinter.font as tkfont
 from tkinter import filedialog, messagebox
@@ -12,6 +19,33 @@ try:
 except ImportError:
     psutil = None
 
+from analytics import SessionHistory
+from config import (
+    DEADLINE_COOLDOWN,
+    DEADLINE_SESSION_END,
+    DEADLINE_WARNING,
+    DEFAULT_SESSION_MINUTES,
+    custom_game_config,
+    custom_games,
+    default_games,
+    parse_game_paths,
+    parse_library_roots,
+    parse_session_minutes,
+    read_settings,
+    platform_name,
+    user_config_path,
+    user_library_index_path,
+)
+from enforcement import BLOCKED_DAILY_LIMIT, BLOCKED_QUOTA_RUNNING, EnforcementCore
+from launcher import LAUNCH_READY, LAUNCH_TIMEOUT, LaunchPipeline
+from library import LibraryIndex, LibraryScan
+from metrics import start_exporters
+from process_backend import create_process_backend
+from profiles import day_key
+from resources import ResourceRing, format_bytes
+from watcher import FileWatcher
+from tracing import TraceRecorder
+
 if sys.platform == "darwin":
     try:
         from AppKit import NSApplication
@@ -32,49 +66,48 @@ else:
 
 
 ADMIN_PASSWORD_DEFAULT = "123456"
-COOLDOWN_SECONDS = 60 * 60
-DEFAULT_SESSION_MINUTES = 40.0
-
-
-def user_config_path():
-    if sys.platform.startswith("win"):
-        base_dir = os.environ.get("APPDATA") or os.path.expanduser("~")
-    elif sys.platform == "darwin":
-        base_dir = os.path.join(os.path.expanduser("~"), "Library", "Application Support")
-    else:
-        base_dir = os.path.join(os.path.expanduser("~"), ".config")
-    return os.path.join(base_dir, "PCTimer", "settings.json")
-
-
-def platform_name():
-    if sys.platform.startswith("win"):
-        return "windows"
-    if sys.platform == "darwin":
-        return "mac"
-    return "other"
+LAUNCH_POLL_MS = 50
+LIBRARY_POLL_MS = 100
+LOCKDOWN_CHECK_MS = 80
+LOCKDOWN_SAFETY_MS = 5000
 
 
 def now_ts():
     return time.time()
 
 
-class GameConfig:
-    def __init__(
-        self,
-        name,
-        identifiers,
-        path_candidates,
-        kill_process_on_timeout=True,
-        track_process_state=True,
-    ):
-        self.name = name
-        self.identifiers = identifiers
-        self.path_candidates = path_candidates
-        self.kill_process_on_timeout = kill_process_on_timeout
-        self.track_process_state = track_process_state
+def path_exists(path):
+    return os.path.exists(path)
 
 
 class GameState:
+    __slots__ = (
+        "config",
+        "path_var",
+        "time_var",
+        "status_var",
+        "remaining_var",
+        "running",
+        "launching",
+        "launch_duration",
+        "popen",
+        "pid",
+        "process",
+        "end_ts",
+        "start_ts",
+        "end_deadline",
+        "warning_deadline",
+        "path_entry",
+        "time_entry",
+        "browse_btn",
+        "start_btn",
+        "stop_btn",
+        "resources",
+        "pending_path",
+        "pending_minutes",
+        "tree_pids",
+    )
+
     def __init__(self, config):
         self.config = config
         self.path_var = tk.StringVar(value="")
@@ -82,20 +115,39 @@ class GameState:
         self.status_var = tk.StringVar(value="Ready")
         self.remaining_var = tk.StringVar(value="--:--")
         self.running = False
+        self.launching = False
+        self.launch_duration = None
         self.popen = None
         self.pid = None
+        self.process = None
         self.end_ts = None
         self.start_ts = None
+        self.end_deadline = None
+        self.warning_deadline = None
         self.path_entry = None
         self.time_entry = None
         self.browse_btn = None
         self.start_btn = None
         self.stop_btn = None
+        self.resources = ResourceRing()
+        self.pending_path = None
+        self.pending_minutes = None
+        self.tree_pids = set()
+
+    @property
+    def path(self):
+        return self.path_var.get().strip()
+
+    @path.setter
+    def path(self, value):
+        self.path_var.set(value)
 
     def reset_session(self):
         self.running = False
         self.popen = None
         self.pid = None
+        self.process = None
+        self.tree_pids = set()
         self.end_ts = None
         self.start_ts = None
         self.remaining_var.set("--:--")
@@ -199,7 +251,7 @@ class CanvasButton(tk.Canvas):
         self._apply_default_style()
 
 
-class TimerApp:
+class TimerApp(EnforcementCore):
     def __init__(self, root):
         self.root = root
         self.root.title("PC Timer")
@@ -208,6 +260,9 @@ class TimerApp:
         self.root.bind("<F11>", self.toggle_fullscreen)
         self.root.protocol("WM_DELETE_WINDOW", self.on_close_request)
         self.root.bind("<Unmap>", self.on_unmap)
+        self.root.bind("<Map>", self.on_map)
+        self.root.bind("<Visibility>", self.on_visibility)
+        self.root.bind("<FocusOut>", self.on_focus_out)
         self.root.bind_all("<Alt-F4>", self.block_shortcuts)
         self.root.bind_all("<Control-q>", self.block_shortcuts)
         self.root.bind_all("<Command-q>", self.block_shortcuts)
@@ -216,50 +271,124 @@ class TimerApp:
         self.root.bind_all("<Escape>", self.block_shortcuts)
 
         self.admin_password = ADMIN_PASSWORD_DEFAULT
-        self.cooldown_until = None
+        self.warning_states = set()
         self.lockdown_active = True
         self.last_lockdown_state = None
+        self.lockdown_check_job = None
+        self.lockdown_check_reason = None
+        self.lockdown_safety_job = None
+        self.window_visible = True
         self.macos_kiosk_available = APPKIT_AVAILABLE
         self.macos_lock_warning_shown = False
         self.config_path = user_config_path()
-        self.saved_paths = self.load_saved_paths()
+        self.settings_watcher = FileWatcher([self.config_path])
+        super().__init__(read_settings(self.config_path) or {}, create_process_backend())
+        self.launch_pipeline = LaunchPipeline()
+        self.launch_poll_job = None
+        self.library = None
 
         self.games = self.build_games()
         self.game_states = [GameState(cfg) for cfg in self.games]
+        session_minutes = parse_session_minutes(self.settings)
+        for state in self.game_states:
+            if state.config.name in session_minutes:
+                state.time_var.set(f"{session_minutes[state.config.name]:.2f}")
 
         self.overlay = None
         self.overlay_label = None
+        self.overlay_visible = False
+        self.tick_job = None
 
         self.build_ui()
         self.detect_paths()
+        self.restore_session_snapshot()
         self.tick()
 
-    def load_saved_paths(self):
-        try:
-            with open(self.config_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError, OSError):
-            return {}
-        if not isinstance(data, dict):
-            return {}
-        paths = data.get("game_paths", {})
-        if not isinstance(paths, dict):
-            return {}
-        cleaned = {}
-        for key, value in paths.items():
-            if isinstance(key, str) and isinstance(value, str) and value.strip():
-                cleaned[key] = value.strip()
-        return cleaned
-
-    def save_saved_paths(self):
+    def now(self):
+        return now_ts()
+
+    def session_status(self, state, text):
+        state.status_var.set(text)
+
+    def refresh_allowance(self):
+        super().refresh_allowance()
+        if hasattr(self, "profile_label") and self.window_visible:
+            self.update_profile_label()
+
+    def update_profile_label(self):
+        text = f"Profile: {self.profile.name}"
+        if self.allowance_remaining is not None:
+            text += f"  |  Today: {self.format_seconds(int(self.allowance_remaining))} left"
+        if self.quota_remaining is not None:
+            text += f"  |  Quota: {self.format_seconds(int(self.quota_remaining))} left"
+        self.profile_label.config(text=text)
+
+    def switch_profile(self, profile):
+        if self.any_game_running() or profile is None:
+            return
+        self.profile = profile
+        self.profile_store.set_active_profile(profile)
+        self.load_profile_state()
+        self.save_session_snapshot()
+        self.refresh_controls()
+
+    def save_setting_entry(self, key, name, value):
+        # Only the one entry is written, so values pushed to the file since
+        # the last reload are kept. self.settings stays what was last applied,
+        # so the watcher still applies such a push on its next poll.
         config_dir = os.path.dirname(self.config_path)
         os.makedirs(config_dir, exist_ok=True)
-        payload = {"game_paths": self.saved_paths}
+        payload = read_settings(self.config_path)
+        if payload is None:
+            # Corrupt or half-written: do not replace it with a single key.
+            raise OSError(f"{self.config_path} could not be read")
+        entries = payload.get(key)
+        entries = dict(entries) if isinstance(entries, dict) else {}
+        entries[name] = value
+        payload = dict(payload)
+        payload[key] = entries
         temp_path = f"{self.config_path}.tmp"
         with open(temp_path, "w", encoding="utf-8") as f:
             json.dump(payload, f, ensure_ascii=True, indent=2)
         os.replace(temp_path, self.config_path)
 
+    def reload_settings(self):
+        settings = read_settings(self.config_path)
+        if settings is None or settings == self.settings:
+            return
+        previous = self.settings
+        self.apply_settings(settings)
+
+        old_paths, new_paths = parse_game_paths(previous), parse_game_paths(settings)
+        old_minutes, new_minutes = parse_session_minutes(previous), parse_session_minutes(settings)
+        for state in self.game_states:
+            name = state.config.name
+            busy = state.running or state.launching
+            path = new_paths.get(name)
+            if path is not None and path != old_paths.get(name):
+                self.saved_paths[name] = path
+                if busy:
+                    state.pending_path = path
+                else:
+                    state.path_var.set(path)
+                    state.status_var.set("Ready" if path_exists(path) else "Path not found")
+            minutes = new_minutes.get(name)
+            if minutes is not None and minutes != old_minutes.get(name):
+                if busy:
+                    state.pending_minutes = minutes
+                else:
+                    state.time_var.set(f"{minutes:.2f}")
+        self.refresh_controls()
+
+    def apply_pending_settings(self, state):
+        # Changes to settings.json that arrived while the game was busy.
+        if state.pending_path is not None:
+            state.path_var.set(state.pending_path)
+            state.pending_path = None
+        if state.pending_minutes is not None:
+            state.time_var.set(f"{state.pending_minutes:.2f}")
+            state.pending_minutes = None
+
     def remember_game_path(self, game_name, path):
         if not path:
             return
@@ -268,112 +397,35 @@ class TimerApp:
             return
         self.saved_paths[game_name] = cleaned
         try:
-            self.save_saved_paths()
+            self.save_setting_entry("game_paths", game_name, cleaned)
         except OSError:
             return
 
-    def discover_windows_xbox_minecraft_paths(self):
-        roots = []
-        seen_roots = set()
-
-        for letter in "CDEFGHIJKLMNOPQRSTUVWXYZ":
-            drive = f"{letter}:\\"
-            xbox_root = os.path.join(drive, "XboxGames")
-            gaming_root_flag = os.path.join(drive, ".GamingRoot")
-            if os.path.isdir(xbox_root) or os.path.isfile(gaming_root_flag):
-                normalized = os.path.normcase(os.path.normpath(xbox_root))
-                if normalized not in seen_roots:
-                    seen_roots.add(normalized)
-                    roots.append(xbox_root)
-
-        if not roots:
-            roots = [r"C:\XboxGames"]
-
-        found = []
-        seen_paths = set()
-
-        def add_if_exists(path):
-            if not os.path.exists(path):
-                return
-            normalized = os.path.normcase(os.path.normpath(path))
-            if normalized in seen_paths:
-                return
-            seen_paths.add(normalized)
-            found.append(path)
-
-        preferred_rel_paths = [
-            os.path.join("Minecraft Launcher", "Content", "MinecraftLauncher.exe"),
-            os.path.join("Minecraft Launcher", "Content", "Minecraft.exe"),
-            os.path.join("Minecraft", "Content", "MinecraftLauncher.exe"),
-            os.path.join("Minecraft", "Content", "Minecraft.exe"),
-        ]
-
-        for root in roots:
-            for rel_path in preferred_rel_paths:
-                add_if_exists(os.path.join(root, rel_path))
-
-        targets = {"minecraftlauncher.exe", "minecraft.exe"}
-        for root in roots:
-            if not os.path.isdir(root):
-                continue
-            for dirpath, dirnames, filenames in os.walk(root):
-                rel = os.path.relpath(dirpath, root)
-                depth = 0 if rel == "." else rel.count(os.sep) + 1
-                if depth > 5:
-                    dirnames[:] = []
-                    continue
-                for filename in filenames:
-                    if filename.lower() in targets:
-                        add_if_exists(os.path.join(dirpath, filename))
-                if len(found) >= 8:
-                    return found
-        return found
-
     def build_games(self):
-        system = platform_name()
-        chrome_paths = []
-        minecraft_paths = []
-
-        if system == "windows":
-            chrome_paths = [
-                r"C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe",
-                r"C:\\Program Files (x86)\\Google\\Chrome\\Application\\chrome.exe",
-            ]
-            minecraft_paths = self.discover_windows_xbox_minecraft_paths() + [
-                r"C:\\XboxGames\\Minecraft Launcher\\Content\\MinecraftLauncher.exe",
-                r"C:\\XboxGames\\Minecraft Launcher\\Content\\Minecraft.exe",
-                r"C:\\XboxGames\\Minecraft\\Content\\MinecraftLauncher.exe",
-                r"C:\\XboxGames\\Minecraft\\Content\\Minecraft.exe",
-                r"C:\\Program Files (x86)\\Minecraft Launcher\\MinecraftLauncher.exe",
-                r"C:\\Program Files\\Minecraft Launcher\\MinecraftLauncher.exe",
-            ]
-        elif system == "mac":
-            chrome_paths = [
-                "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
-            ]
-            minecraft_paths = [
-                "/Applications/Minecraft.app/Contents/MacOS/Minecraft",
-                "/Applications/Minecraft Launcher.app/Contents/MacOS/Minecraft Launcher",
-            ]
-
-        games = [
-            GameConfig(
-                name="Minecraft",
-                identifiers=["minecraft", "javaw", "minecraftlauncher"],
-                path_candidates=minecraft_paths,
-                kill_process_on_timeout=True,
-                track_process_state=True,
-            ),
-            GameConfig(
-                name="Chrome",
-                identifiers=["chrome", "google chrome"],
-                path_candidates=chrome_paths,
-                kill_process_on_timeout=False,
-                track_process_state=False,
-            ),
-        ]
-
-        return games
+        return default_games() + custom_games(self.settings)
+
+    def add_game_state(self, config):
+        self.games.append(config)
+        state = GameState(config)
+        self.game_states.append(state)
+        self.build_game_row(len(self.game_states), state)
+        path = config.path_candidates[0] if config.path_candidates else ""
+        state.path_var.set(self.saved_paths.get(config.name, path))
+        state.status_var.set("Ready" if path_exists(state.path_var.get()) else "Path not found")
+        self.exe_index_dirty = True
+        return state
+
+    def add_custom_game(self, name, path):
+        if any(state.config.name == name for state in self.game_states):
+            return None
+        try:
+            self.save_setting_entry("custom_games", name, path)
+        except OSError:
+            return None
+        state = self.add_game_state(custom_game_config(name, path))
+        self.remember_game_path(name, path)
+        self.refresh_controls()
+        return state
 
     def make_button(self, parent, text, command, bg, fg, active_bg, active_fg):
         return CanvasButton(
@@ -408,13 +460,24 @@ class TimerApp:
         )
         self.cooldown_label.pack(side="right")
 
+        self.profile_label = tk.Label(
+            header,
+            text="",
+            fg="#cbd5e1",
+            bg="#0f1115",
+            font=("Helvetica", 14),
+        )
+        self.profile_label.pack(side="right", padx=24)
+        self.update_profile_label()
+
         button_row = tk.Frame(self.root, bg="#0f1115")
         button_row.pack(fill="x", padx=24)
 
         self.rescan_btn = self.make_button(
             button_row,
             text="Rescan Paths",
-            command=self.detect_paths,
+            # Looked up on click so a trace recorder's wrapper is used.
+            command=lambda: self.detect_paths(),
             bg="#1f2937",
             fg="#e2e8f0",
             active_bg="#334155",
@@ -444,8 +507,42 @@ class TimerApp:
         )
         self.admin_exit_btn.pack(side="right", padx=8)
 
+        self.admin_reports_btn = self.make_button(
+            button_row,
+            text="Admin Reports",
+            command=self.prompt_admin_reports,
+            bg="#1e3a8a",
+            fg="#eff6ff",
+            active_bg="#1d4ed8",
+            active_fg="#eff6ff",
+        )
+        self.admin_reports_btn.pack(side="right")
+
+        self.admin_profiles_btn = self.make_button(
+            button_row,
+            text="Admin Profiles",
+            command=self.prompt_admin_profiles,
+            bg="#134e4a",
+            fg="#f0fdfa",
+            active_bg="#0f766e",
+            active_fg="#f0fdfa",
+        )
+        self.admin_profiles_btn.pack(side="right", padx=8)
+
+        self.admin_library_btn = self.make_button(
+            button_row,
+            text="Admin Add Game",
+            command=self.prompt_admin_library,
+            bg="#78350f",
+            fg="#fffbeb",
+            active_bg="#92400e",
+            active_fg="#fffbeb",
+        )
+        self.admin_library_btn.pack(side="right")
+
         list_frame = tk.Frame(self.root, bg="#0f1115")
         list_frame.pack(fill="both", expand=True, padx=24, pady=16)
+        self.games_frame = list_frame
 
         headers = [
             "Game",
@@ -466,98 +563,7 @@ class TimerApp:
             label.grid(row=0, column=col, sticky="w", padx=6, pady=4)
 
         for idx, state in enumerate(self.game_states, start=1):
-            name_label = tk.Label(
-                list_frame,
-                text=state.config.name,
-                fg="#f8fafc",
-                bg="#0f1115",
-                font=("Helvetica", 14),
-            )
-            name_label.grid(row=idx, column=0, sticky="w", padx=6, pady=8)
-
-            path_entry = tk.Entry(
-                list_frame,
-                textvariable=state.path_var,
-                width=56,
-                bg="#111827",
-                fg="#e2e8f0",
-                insertbackground="#e2e8f0",
-                relief="flat",
-            )
-            path_entry.grid(row=idx, column=1, sticky="w", padx=6, pady=8)
-            state.path_entry = path_entry
-
-            time_entry = tk.Entry(
-                list_frame,
-                textvariable=state.time_var,
-                width=10,
-                bg="#111827",
-                fg="#e2e8f0",
-                insertbackground="#e2e8f0",
-                relief="flat",
-                justify="center",
-            )
-            time_entry.grid(row=idx, column=2, sticky="w", padx=6, pady=8)
-            state.time_entry = time_entry
-            state.path_var.trace_add("write", lambda *_: self.refresh_controls())
-            state.time_var.trace_add("write", lambda *_: self.refresh_controls())
-
-            status_label = tk.Label(
-                list_frame,
-                textvariable=state.status_var,
-                fg="#e2e8f0",
-                bg="#0f1115",
-                font=("Helvetica", 12),
-            )
-            status_label.grid(row=idx, column=3, sticky="w", padx=6, pady=8)
-
-            remaining_label = tk.Label(
-                list_frame,
-                textvariable=state.remaining_var,
-                fg="#fef08a",
-                bg="#0f1115",
-                font=("Helvetica", 12),
-            )
-            remaining_label.grid(row=idx, column=4, sticky="w", padx=6, pady=8)
-
-            action_frame = tk.Frame(list_frame, bg="#0f1115")
-            action_frame.grid(row=idx, column=5, sticky="w", padx=6, pady=8)
-
-            browse_btn = self.make_button(
-                action_frame,
-                text="Set Path",
-                command=lambda s=state: self.choose_path(s),
-                bg="#1f2937",
-                fg="#e2e8f0",
-                active_bg="#334155",
-                active_fg="#f8fafc",
-            )
-            browse_btn.pack(side="left", padx=2)
-            state.browse_btn = browse_btn
-
-            start_btn = self.make_button(
-                action_frame,
-                text="Start",
-                command=lambda s=state: self.start_game(s),
-                bg="#065f46",
-                fg="#ecfdf5",
-                active_bg="#047857",
-                active_fg="#ecfdf5",
-            )
-            start_btn.pack(side="left", padx=2)
-            state.start_btn = start_btn
-
-            stop_btn = self.make_button(
-                action_frame,
-                text="Stop",
-                command=lambda s=state: self.stop_game(s, manual=True),
-                bg="#7f1d1d",
-                fg="#fef2f2",
-                active_bg="#991b1b",
-                active_fg="#fef2f2",
-            )
-            stop_btn.pack(side="left", padx=2)
-            state.stop_btn = stop_btn
+            self.build_game_row(idx, state)
 
         footer = tk.Label(
             self.root,
@@ -575,6 +581,100 @@ class TimerApp:
             )
         self.refresh_controls()
 
+    def build_game_row(self, idx, state):
+        name_label = tk.Label(
+            self.games_frame,
+            text=state.config.name,
+            fg="#f8fafc",
+            bg="#0f1115",
+            font=("Helvetica", 14),
+        )
+        name_label.grid(row=idx, column=0, sticky="w", padx=6, pady=8)
+
+        path_entry = tk.Entry(
+            self.games_frame,
+            textvariable=state.path_var,
+            width=56,
+            bg="#111827",
+            fg="#e2e8f0",
+            insertbackground="#e2e8f0",
+            relief="flat",
+        )
+        path_entry.grid(row=idx, column=1, sticky="w", padx=6, pady=8)
+        state.path_entry = path_entry
+
+        time_entry = tk.Entry(
+            self.games_frame,
+            textvariable=state.time_var,
+            width=10,
+            bg="#111827",
+            fg="#e2e8f0",
+            insertbackground="#e2e8f0",
+            relief="flat",
+            justify="center",
+        )
+        time_entry.grid(row=idx, column=2, sticky="w", padx=6, pady=8)
+        state.time_entry = time_entry
+        state.path_var.trace_add("write", lambda *_: self.on_path_change())
+        state.time_var.trace_add("write", lambda *_: self.refresh_controls())
+
+        status_label = tk.Label(
+            self.games_frame,
+            textvariable=state.status_var,
+            fg="#e2e8f0",
+            bg="#0f1115",
+            font=("Helvetica", 12),
+        )
+        status_label.grid(row=idx, column=3, sticky="w", padx=6, pady=8)
+
+        remaining_label = tk.Label(
+            self.games_frame,
+            textvariable=state.remaining_var,
+            fg="#fef08a",
+            bg="#0f1115",
+            font=("Helvetica", 12),
+        )
+        remaining_label.grid(row=idx, column=4, sticky="w", padx=6, pady=8)
+
+        action_frame = tk.Frame(self.games_frame, bg="#0f1115")
+        action_frame.grid(row=idx, column=5, sticky="w", padx=6, pady=8)
+
+        browse_btn = self.make_button(
+            action_frame,
+            text="Set Path",
+            command=lambda s=state: self.choose_path(s),
+            bg="#1f2937",
+            fg="#e2e8f0",
+            active_bg="#334155",
+            active_fg="#f8fafc",
+        )
+        browse_btn.pack(side="left", padx=2)
+        state.browse_btn = browse_btn
+
+        start_btn = self.make_button(
+            action_frame,
+            text="Start",
+            command=lambda s=state: self.start_game(s),
+            bg="#065f46",
+            fg="#ecfdf5",
+            active_bg="#047857",
+            active_fg="#ecfdf5",
+        )
+        start_btn.pack(side="left", padx=2)
+        state.start_btn = start_btn
+
+        stop_btn = self.make_button(
+            action_frame,
+            text="Stop",
+            command=lambda s=state: self.stop_game(s, manual=True),
+            bg="#7f1d1d",
+            fg="#fef2f2",
+            active_bg="#991b1b",
+            active_fg="#fef2f2",
+        )
+        stop_btn.pack(side="left", padx=2)
+        state.stop_btn = stop_btn
+
     def toggle_fullscreen(self, _event=None):
         if self.lockdown_active:
             return "break"
@@ -590,9 +690,37 @@ class TimerApp:
     def on_close_request(self):
         self.set_status_all("Locked. Use Admin Exit.")
 
-    def on_unmap(self, _event=None):
-        if self.lockdown_active and self.root.state() == "iconic":
-            self.root.after(80, self.restore_if_locked)
+    def on_unmap(self, event=None):
+        if event is not None and event.widget is not self.root:
+            return
+        self.window_visible = False
+        self.schedule_lockdown_check("unmap")
+
+    def on_map(self, event=None):
+        if event is not None and event.widget is not self.root:
+            return
+        self.set_window_visible(True)
+
+    def on_visibility(self, event):
+        if event.widget is not self.root:
+            return
+        visible = str(event.state) != "VisibilityFullyObscured"
+        self.set_window_visible(visible)
+        if not visible:
+            self.schedule_lockdown_check("visibility")
+
+    def on_focus_out(self, event=None):
+        # Focus moving between our own widgets and dialogs also lands here;
+        # check_lockdown() tells those apart once the focus has settled.
+        if event is not None and event.widget is not self.root:
+            return
+        self.schedule_lockdown_check("focus")
+
+    def set_window_visible(self, visible):
+        was_visible = self.window_visible
+        self.window_visible = visible
+        if visible and not was_visible:
+            self.render(now_ts())
 
     def restore_if_locked(self):
         if not self.lockdown_active:
@@ -610,20 +738,63 @@ class TimerApp:
             if not state.running:
                 state.status_var.set(text)
 
+    # Window-manager calls happen only when the lock state changes, when a
+    # window event suggests the lock was escaped, or from the slow safety net.
+    # A steady lock makes no window-manager calls per tick.
     def apply_lockdown_mode(self):
         should_lock = not self.any_game_running()
         self.lockdown_active = should_lock
-
-        if self.last_lockdown_state != should_lock:
-            self.set_system_lockdown(should_lock)
-            self.last_lockdown_state = should_lock
+        if self.last_lockdown_state == should_lock:
+            return
+        self.last_lockdown_state = should_lock
+        self.set_system_lockdown(should_lock)
 
         if should_lock:
             self.restore_if_locked()
-            self.ensure_fullscreen()
-            self.root.attributes("-topmost", True)
+            self.schedule_lockdown_safety()
         else:
             self.root.attributes("-topmost", False)
+            if self.lockdown_safety_job is not None:
+                self.root.after_cancel(self.lockdown_safety_job)
+                self.lockdown_safety_job = None
+
+    def schedule_lockdown_check(self, reason):
+        if not self.lockdown_active or self.lockdown_check_job is not None:
+            return
+        self.lockdown_check_reason = reason
+        self.lockdown_check_job = self.root.after(LOCKDOWN_CHECK_MS, self.check_lockdown)
+
+    def schedule_lockdown_safety(self):
+        self.lockdown_safety_job = self.root.after(LOCKDOWN_SAFETY_MS, self.lockdown_safety_check)
+
+    def lockdown_safety_check(self):
+        self.lockdown_safety_job = None
+        if not self.lockdown_active:
+            return
+        self.lockdown_check_reason = "safety"
+        self.check_lockdown()
+        self.schedule_lockdown_safety()
+
+    def lockdown_escaped(self):
+        if self.root.state() == "iconic":
+            return True
+        # None means the focus is in another application, not in one of our
+        # own dialogs.
+        if self.root.focus_get() is None:
+            return True
+        return not self.root.attributes("-fullscreen")
+
+    def check_lockdown(self):
+        self.lockdown_check_job = None
+        if not self.lockdown_active:
+            return
+        try:
+            escaped = self.lockdown_escaped()
+        except (tk.TclError, KeyError):
+            return
+        if escaped:
+            self.restore_if_locked()
+            self.metrics.lockdown_restores.inc(label_value=self.lockdown_check_reason)
 
     def set_system_lockdown(self, enabled):
         if platform_name() != "mac":
@@ -659,19 +830,19 @@ class TimerApp:
             saved_path = self.saved_paths.get(state.config.name, "")
             if saved_path:
                 state.path_var.set(saved_path)
-                if os.path.exists(saved_path):
+                if path_exists(saved_path):
                     state.status_var.set("Ready")
                     continue
 
             current_path = state.path_var.get().strip()
-            if current_path and os.path.exists(current_path):
+            if current_path and path_exists(current_path):
                 self.remember_game_path(state.config.name, current_path)
                 state.status_var.set("Ready")
                 continue
 
             found = ""
             for path in state.config.path_candidates:
-                if path and os.path.exists(path):
+                if path and path_exists(path):
                     found = path
                     break
             if found:
@@ -683,6 +854,10 @@ class TimerApp:
                     state.status_var.set("Path not found")
         self.refresh_controls()
 
+    def on_path_change(self):
+        self.exe_index_dirty = True
+        self.refresh_controls()
+
     def choose_path(self, state):
         initial_dir = os.path.dirname(state.path_var.get()) if state.path_var.get() else None
         selected = filedialog.askopenfilename(initialdir=initial_dir or None)
@@ -701,36 +876,39 @@ class TimerApp:
             return None
         return round(minutes, 2)
 
-    def cooldown_active(self):
-        return self.cooldown_until is not None and now_ts() < self.cooldown_until
-
-    def cooldown_remaining(self):
-        if not self.cooldown_until:
-            return 0
-        return max(0, int(self.cooldown_until - now_ts()))
-
     def any_game_running(self):
-        return any(state.running for state in self.game_states)
+        return any(state.running or state.launching for state in self.game_states)
+
+    def planned_seconds(self):
+        launching = sum(s.launch_duration for s in self.game_states if s.launching)
+        return super().planned_seconds() + launching
 
     def refresh_controls(self):
+        self.apply_lockdown_mode()
+        if self.window_visible:
+            self.render_controls()
+
+    def render_controls(self):
         cooldown_on = self.cooldown_active()
         any_running = self.any_game_running()
-        self.apply_lockdown_mode()
 
         for state in self.game_states:
             has_valid_time = self.parse_minutes(state.time_var.get()) is not None
-            has_valid_path = bool(state.path_var.get().strip()) and os.path.exists(
+            has_valid_path = bool(state.path_var.get().strip()) and path_exists(
                 state.path_var.get().strip()
             )
+            busy = state.running or state.launching
             can_start = (
-                (not state.running)
+                (not busy)
                 and (not cooldown_on)
+                and (self.allowance_remaining is None or self.allowance_remaining > 0)
+                and (self.quota_remaining is None or self.quota_remaining >= 1)
                 and has_valid_time
                 and has_valid_path
                 and (psutil is not None)
             )
             can_stop = state.running
-            can_browse = not state.running
+            can_browse = not busy
 
             if state.path_entry is not None:
                 state.path_entry.config(state="normal" if can_browse else "disabled")
@@ -749,10 +927,12 @@ class TimerApp:
             self.rescan_btn.set_enabled(not any_running)
         if hasattr(self, "admin_exit_btn"):
             self.admin_exit_btn.set_enabled(True)
-
-    def start_cooldown_if_idle(self):
-        if not self.any_game_running():
-            self.start_cooldown()
+        if hasattr(self, "admin_reports_btn"):
+            self.admin_reports_btn.set_enabled(not any_running)
+        if hasattr(self, "admin_profiles_btn"):
+            self.admin_profiles_btn.set_enabled(not any_running)
+        if hasattr(self, "admin_library_btn"):
+            self.admin_library_btn.set_enabled(not any_running)
 
     def start_game(self, state):
         if psutil is None:
@@ -765,13 +945,13 @@ class TimerApp:
             self.refresh_controls()
             return
 
-        if state.running:
+        if state.running or state.launching:
             state.status_var.set("Already running")
             self.refresh_controls()
             return
 
         path = state.path_var.get().strip()
-        if not path or not os.path.exists(path):
+        if not path or not path_exists(path):
             state.status_var.set("Invalid path")
             self.refresh_controls()
             return
@@ -783,34 +963,98 @@ class TimerApp:
             self.refresh_controls()
             return
 
-        duration = minutes * 60
-        popen = None
-        pid = None
-
-        try:
-            if platform_name() == "mac" and path.endswith(".app"):
-                popen = subprocess.Popen(["open", "-a", path])
+        now = now_ts()
+        duration, blocked = self.session_budget(minutes * 60, now)
+        if blocked is not None:
+            if blocked == BLOCKED_DAILY_LIMIT:
+                state.status_var.set("Daily limit reached")
+            elif blocked == BLOCKED_QUOTA_RUNNING:
+                state.status_var.set("Quota in use by running games")
             else:
-                popen = subprocess.Popen([path])
-            pid = popen.pid
-        except Exception:
-            state.status_var.set("Launch failed")
+                next_ts = self.quotas.next_allowed(now)
+                state.status_var.set(
+                    f"Quota until {time.strftime('%a %H:%M', time.localtime(next_ts))}"
+                )
             self.refresh_controls()
             return
 
-        state.running = True
-        state.popen = popen
-        state.pid = pid
-        state.start_ts = now_ts()
-        state.end_ts = state.start_ts + duration
-        state.status_var.set("Running")
-        state.remaining_var.set(self.format_seconds(int(duration)))
+        helper = platform_name() == "mac" and path.endswith(".app")
+        argv = ["open", "-a", path] if helper else [path]
+        state.launching = True
+        state.launch_duration = duration
+        state.status_var.set("Launching")
+        self.launch_pipeline.launch(
+            state,
+            state.config.name,
+            argv,
+            self.game_paths(state),
+            state.config.identifiers,
+            helper=helper,
+        )
+        self.schedule_launch_poll()
         try:
             self.root.iconify()
         except tk.TclError:
             pass
         self.refresh_controls()
 
+    def schedule_launch_poll(self):
+        if self.launch_poll_job is None:
+            self.launch_poll_job = self.root.after(LAUNCH_POLL_MS, self.poll_launches)
+
+    def poll_launches(self):
+        self.launch_poll_job = None
+        for result in self.launch_pipeline.poll():
+            self.finish_launch(result)
+        if self.launch_pipeline.pending:
+            self.schedule_launch_poll()
+
+    def finish_launch(self, result):
+        state = result.target
+        duration = state.launch_duration
+        state.launching = False
+        state.launch_duration = None
+        self.metrics.launches.inc(label_value=result.status)
+        if result.status != LAUNCH_READY:
+            if result.status == LAUNCH_TIMEOUT:
+                state.status_var.set("Launch timed out")
+            elif result.error:
+                state.status_var.set(f"Launch failed: {result.error}")
+            else:
+                state.status_var.set("Launch failed")
+            self.apply_pending_settings(state)
+            self.refresh_controls()
+            return
+
+        if result.latency is not None:
+            self.metrics.launch_seconds.observe(result.latency)
+        start_ts = now_ts()
+        self.begin_session(state, result.popen, result.pid, start_ts, start_ts + duration)
+        proc = self.tracked_process(state)
+        if proc is not None and result.create_time is not None:
+            try:
+                if abs(proc.create_time() - result.create_time) > 0.01:
+                    state.pid = None
+                    state.process = None
+            except psutil.Error:
+                state.pid = None
+                state.process = None
+        self.save_session_snapshot()
+        self.refresh_controls()
+
+    def begin_session(self, state, popen, pid, start_ts, end_ts):
+        super().begin_session(state, popen, pid, start_ts, end_ts)
+        state.status_var.set("Running")
+        state.remaining_var.set(self.format_seconds(max(0, int(end_ts - now_ts()))))
+
+    def restore_session_snapshot(self):
+        if super().restore_session_snapshot():
+            try:
+                self.root.iconify()
+            except tk.TclError:
+                pass
+        self.refresh_controls()
+
     def stop_game(self, state, manual=False):
         if not state.running:
             state.status_var.set("Not running")
@@ -819,53 +1063,16 @@ class TimerApp:
 
         if state.config.kill_process_on_timeout:
             self.kill_game_process(state)
-        state.status_var.set("Stopped")
-        state.reset_session()
+        self.finish_session(state, "Stopped")
 
         if manual:
             self.start_cooldown_if_idle()
         self.refresh_controls()
 
-    def start_cooldown(self):
-        self.cooldown_until = now_ts() + COOLDOWN_SECONDS
-
-    def kill_game_process(self, state):
-        if psutil is None:
-            return
-        if not state.config.kill_process_on_timeout:
-            return
-
-        targets = []
-        if state.pid and psutil.pid_exists(state.pid):
-            try:
-                targets.append(psutil.Process(state.pid))
-            except psutil.Error:
-                pass
-
-        identifiers = [i.lower() for i in state.config.identifiers]
-        for proc in psutil.process_iter(["pid", "name", "exe", "cmdline"]):
-            try:
-                name = (proc.info.get("name") or "").lower()
-                exe = (proc.info.get("exe") or "").lower()
-                cmd = " ".join(proc.info.get("cmdline") or []).lower()
-                haystack = f"{name} {exe} {cmd}"
-                if any(token in haystack for token in identifiers):
-                    targets.append(proc)
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
-
-        for proc in targets:
-            try:
-                proc.terminate()
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                pass
-
-        gone, alive = psutil.wait_procs(targets, timeout=2)
-        for proc in alive:
-            try:
-                proc.kill()
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                pass
+    def finish_session(self, state, reason):
+        self.warning_states.discard(state)
+        super().finish_session(state, reason)
+        self.apply_pending_settings(state)
 
     def format_seconds(self, seconds):
         minutes = seconds // 60
@@ -874,10 +1081,9 @@ class TimerApp:
 
     def update_overlay(self, remaining_seconds):
         if remaining_seconds is None:
-            if self.overlay is not None:
-                self.overlay.destroy()
-                self.overlay = None
-                self.overlay_label = None
+            if self.overlay_visible:
+                self.overlay.withdraw()
+                self.overlay_visible = False
             return
 
         if self.overlay is None:
@@ -896,6 +1102,11 @@ class TimerApp:
                 pady=10,
             )
             self.overlay_label.pack()
+            self.overlay_visible = True
+        elif not self.overlay_visible:
+            self.overlay.deiconify()
+            self.overlay.attributes("-topmost", True)
+            self.overlay_visible = True
 
         self.overlay_label.configure(text=self.format_seconds(int(remaining_seconds)))
         self.overlay.update_idletasks()
@@ -911,22 +1122,20 @@ class TimerApp:
         self.root.lift()
         self.root.attributes("-topmost", True)
 
-    def prompt_admin_reset(self):
-        if self.any_game_running():
-            return
-        if not self.cooldown_active():
-            return
-
+    def prompt_admin_password(
+        self, title, on_success, button_text, colors, prompt="Enter admin password"
+    ):
         dialog = tk.Toplevel(self.root)
-        dialog.title("Admin Reset")
+        dialog.title(title)
         dialog.configure(bg="#0f1115")
         dialog.geometry("320x160")
         dialog.transient(self.root)
         dialog.grab_set()
+        dialog.attributes("-topmost", True)
 
         label = tk.Label(
             dialog,
-            text="Enter admin password",
+            text=prompt,
             fg="#e2e8f0",
             bg="#0f1115",
             font=("Helvetica", 12),
@@ -942,97 +1151,503 @@ class TimerApp:
 
         def submit():
             if entry.get() == self.admin_password:
-                self.cooldown_until = None
-                self.refresh_controls()
                 dialog.destroy()
+                on_success()
             else:
                 status.config(text="Wrong password")
 
+        bg, fg, active_bg, active_fg = colors
         submit_btn = self.make_button(
             dialog,
-            text="Reset Cooldown",
+            text=button_text,
             command=submit,
+            bg=bg,
+            fg=fg,
+            active_bg=active_bg,
+            active_fg=active_fg,
+        )
+        submit_btn.pack(pady=8)
+
+    def prompt_admin_reset(self):
+        if self.any_game_running():
+            return
+        if not self.cooldown_active():
+            return
+
+        def reset():
+            self.clear_cooldown()
+            self.refresh_controls()
+
+        self.prompt_admin_password(
+            "Admin Reset",
+            reset,
+            "Reset Cooldown",
+            ("#065f46", "#ecfdf5", "#047857", "#ecfdf5"),
+        )
+
+    def prompt_admin_exit(self):
+        def exit_app():
+            self.set_system_lockdown(False)
+            self.process_backend.close()
+            self.settings_watcher.close()
+            self.profile_store.close()
+            self.root.destroy()
+
+        self.prompt_admin_password(
+            "Admin Exit",
+            exit_app,
+            "Exit App",
+            ("#7f1d1d", "#fef2f2", "#991b1b", "#fef2f2"),
+            prompt="Enter admin password to exit",
+        )
+
+    def prompt_admin_reports(self):
+        if self.any_game_running():
+            return
+        self.prompt_admin_password(
+            "Admin Reports",
+            self.show_reports,
+            "Open Reports",
+            ("#1e3a8a", "#eff6ff", "#1d4ed8", "#eff6ff"),
+        )
+
+    def prompt_admin_profiles(self):
+        if self.any_game_running():
+            return
+        self.prompt_admin_password(
+            "Admin Profiles",
+            self.show_profiles,
+            "Manage Profiles",
+            ("#134e4a", "#f0fdfa", "#0f766e", "#f0fdfa"),
+        )
+
+    def show_profiles(self):
+        window = tk.Toplevel(self.root)
+        window.title("Profiles")
+        window.configure(bg="#0f1115")
+        window.geometry("520x420")
+        window.transient(self.root)
+        window.grab_set()
+        window.attributes("-topmost", True)
+
+        list_frame = tk.Frame(window, bg="#0f1115")
+        list_frame.pack(fill="both", expand=True, padx=12, pady=8)
+
+        form = tk.Frame(window, bg="#0f1115")
+        form.pack(fill="x", padx=12, pady=8)
+
+        name_var = tk.StringVar(value="")
+        allowance_var = tk.StringVar(value="")
+        status = tk.Label(window, text="", fg="#f87171", bg="#0f1115")
+        status.pack(pady=4)
+
+        def render():
+            for child in list_frame.winfo_children():
+                child.destroy()
+            today = day_key(now_ts())
+            for row, profile in enumerate(self.profile_store.list_profiles()):
+                remaining = self.profile_store.remaining_allowance(profile, today)
+                allowance = (
+                    "Unlimited"
+                    if remaining is None
+                    else f"{self.format_seconds(int(remaining))} left"
+                )
+                marker = "*" if profile.id == self.profile.id else " "
+                tk.Label(
+                    list_frame,
+                    text=f"{marker} {profile.name}",
+                    fg="#f8fafc",
+                    bg="#0f1115",
+                    font=("Helvetica", 12),
+                ).grid(row=row, column=0, sticky="w", padx=6, pady=4)
+                tk.Label(
+                    list_frame,
+                    text=allowance,
+                    fg="#94a3b8",
+                    bg="#0f1115",
+                    font=("Helvetica", 12),
+                ).grid(row=row, column=1, sticky="w", padx=6, pady=4)
+                self.make_button(
+                    list_frame,
+                    text="Switch",
+                    command=lambda p=profile: select(p),
+                    bg="#1f2937",
+                    fg="#e2e8f0",
+                    active_bg="#334155",
+                    active_fg="#f8fafc",
+                ).grid(row=row, column=2, sticky="w", padx=6, pady=4)
+
+        def select(profile):
+            self.switch_profile(profile)
+            name_var.set(profile.name)
+            if profile.daily_allowance_minutes is None:
+                allowance_var.set("")
+            else:
+                allowance_var.set(f"{profile.daily_allowance_minutes:.2f}")
+            render()
+
+        def save():
+            name = name_var.get().strip()
+            if not name:
+                status.config(text="Name required")
+                return
+            allowance_text = allowance_var.get().strip()
+            allowance = None
+            if allowance_text:
+                allowance = self.parse_minutes(allowance_text)
+                if allowance is None:
+                    status.config(text="Invalid allowance")
+                    return
+            profile = self.profile_store.find_profile(name)
+            if profile is None:
+                profile = self.profile_store.create_profile(name, allowance)
+            else:
+                self.profile_store.set_allowance(profile, allowance)
+            status.config(text="")
+            if profile.id == self.profile.id:
+                self.refresh_allowance()
+                self.refresh_controls()
+            render()
+
+        tk.Label(form, text="Name", fg="#94a3b8", bg="#0f1115").grid(row=0, column=0, sticky="w")
+        tk.Entry(
+            form, textvariable=name_var, bg="#111827", fg="#f8fafc", relief="flat"
+        ).grid(row=0, column=1, sticky="w", padx=6)
+        tk.Label(form, text="Daily min", fg="#94a3b8", bg="#0f1115").grid(
+            row=1, column=0, sticky="w"
+        )
+        tk.Entry(
+            form, textvariable=allowance_var, width=10, bg="#111827", fg="#f8fafc", relief="flat"
+        ).grid(row=1, column=1, sticky="w", padx=6, pady=4)
+        self.make_button(
+            form,
+            text="Save Profile",
+            command=save,
             bg="#065f46",
             fg="#ecfdf5",
             active_bg="#047857",
             active_fg="#ecfdf5",
-        )
-        submit_btn.pack(pady=8)
+        ).grid(row=0, column=2, rowspan=2, padx=6)
+        self.make_button(
+            form,
+            text="Close",
+            command=window.destroy,
+            bg="#1f2937",
+            fg="#e2e8f0",
+            active_bg="#334155",
+            active_fg="#f8fafc",
+        ).grid(row=0, column=3, rowspan=2, padx=6)
 
-    def prompt_admin_exit(self):
-        dialog = tk.Toplevel(self.root)
-        dialog.title("Admin Exit")
-        dialog.configure(bg="#0f1115")
-        dialog.geometry("320x180")
-        dialog.transient(self.root)
-        dialog.grab_set()
-        dialog.attributes("-topmost", True)
+        render()
 
-        label = tk.Label(
-            dialog,
-            text="Enter admin password to exit",
+    def show_reports(self):
+        report = SessionHistory()
+        report.merge(self.history)
+        options = {"period": "day", "by_station": True}
+
+        window = tk.Toplevel(self.root)
+        window.title("Playtime Reports")
+        window.configure(bg="#0f1115")
+        window.geometry("760x520")
+        window.transient(self.root)
+        window.grab_set()
+        window.attributes("-topmost", True)
+
+        controls = tk.Frame(window, bg="#0f1115")
+        controls.pack(fill="x", padx=12, pady=8)
+
+        summary = tk.Label(window, text="", fg="#94a3b8", bg="#0f1115", anchor="w")
+        summary.pack(fill="x", padx=12)
+
+        text = tk.Text(
+            window,
+            bg="#111827",
             fg="#e2e8f0",
-            bg="#0f1115",
-            font=("Helvetica", 12),
+            relief="flat",
+            font=("Courier", 11),
+            wrap="none",
         )
-        label.pack(pady=12)
+        text.pack(fill="both", expand=True, padx=12, pady=8)
+
+        def render():
+            rows = report.aggregate(options["period"], options["by_station"])
+            text.config(state="normal")
+            text.delete("1.0", "end")
+            period_title = "Day" if options["period"] == "day" else "Week"
+            text.insert(
+                "end",
+                f"{period_title:<12}{'Station':<20}{'Game':<16}{'Sessions':>9}{'Minutes':>10}\n",
+            )
+            for label, station, game, count, seconds in rows:
+                text.insert(
+                    "end",
+                    f"{label:<12}{station[:19]:<20}{game[:15]:<16}{count:>9}{seconds / 60:>10.1f}\n",
+                )
+            usage = self.profile_store.resource_usage()
+            if usage:
+                text.insert(
+                    "end",
+                    f"\nResource usage on this station\n{'Game':<20}{'Sessions':>9}"
+                    f"{'CPU avg':>9}{'CPU max':>9}{'RSS avg':>12}{'RSS max':>12}{'Procs':>7}\n",
+                )
+                for game, count, cpu_avg, cpu_peak, rss_avg, rss_peak, procs in usage:
+                    text.insert(
+                        "end",
+                        f"{game[:19]:<20}{count:>9}{cpu_avg:>8.0f}%{cpu_peak:>8.0f}%"
+                        f"{format_bytes(rss_avg):>12}{format_bytes(rss_peak):>12}{procs:>7}\n",
+                    )
+            for state in self.game_states:
+                if state.running:
+                    recent = state.resources.recent_summary()
+                    if recent is not None:
+                        text.insert(
+                            "end",
+                            f"{state.config.name} now, last {recent.samples} samples: "
+                            f"{recent.describe()}\n",
+                        )
+                    continue
+                last = state.resources.summary()
+                if last is not None:
+                    text.insert("end", f"Last {state.config.name} session: {last.describe()}\n")
+            text.config(state="disabled")
+            summary.config(
+                text=f"{len(report)} sessions from {len(report.stations)} station(s)"
+            )
 
-        entry = tk.Entry(dialog, show="*", bg="#111827", fg="#f8fafc", relief="flat")
-        entry.pack(pady=6)
-        entry.focus_set()
+        def set_period(period):
+            options["period"] = period
+            render()
 
-        status = tk.Label(dialog, text="", fg="#f87171", bg="#0f1115")
+        def toggle_station():
+            options["by_station"] = not options["by_station"]
+            render()
+
+        def import_station():
+            directory = filedialog.askdirectory(parent=window)
+            if not directory:
+                return
+            report.merge(SessionHistory(directory))
+            render()
+
+        def export_csv():
+            path = filedialog.asksaveasfilename(
+                parent=window,
+                defaultextension=".csv",
+                filetypes=[("CSV", "*.csv")],
+            )
+            if not path:
+                return
+            try:
+                report.export_csv(path, options["period"], options["by_station"])
+            except OSError:
+                messagebox.showerror("Export Failed", f"Could not write {path}", parent=window)
+
+        for label_text, command in (
+            ("Daily", lambda: set_period("day")),
+            ("Weekly", lambda: set_period("week")),
+            ("By Station", toggle_station),
+            ("Import Station", import_station),
+            ("Export CSV", export_csv),
+            ("Close", window.destroy),
+        ):
+            btn = self.make_button(
+                controls,
+                text=label_text,
+                command=command,
+                bg="#1f2937",
+                fg="#e2e8f0",
+                active_bg="#334155",
+                active_fg="#f8fafc",
+            )
+            btn.pack(side="left", padx=2)
+
+        render()
+
+    def prompt_admin_library(self):
+        if self.any_game_running():
+            return
+        self.prompt_admin_password(
+            "Admin Add Game",
+            self.show_library,
+            "Browse Library",
+            ("#78350f", "#fffbeb", "#92400e", "#fffbeb"),
+        )
+
+    def show_library(self):
+        if self.library is None:
+            self.library = LibraryIndex(user_library_index_path())
+        library = self.library
+        shown = []
+        scan = {"job": None}
+
+        window = tk.Toplevel(self.root)
+        window.title("Game Library")
+        window.configure(bg="#0f1115")
+        window.geometry("760x520")
+        window.transient(self.root)
+        window.grab_set()
+        window.attributes("-topmost", True)
+
+        controls = tk.Frame(window, bg="#0f1115")
+        controls.pack(fill="x", padx=12, pady=8)
+
+        query_var = tk.StringVar(value="")
+        name_var = tk.StringVar(value="")
+        tk.Label(controls, text="Search", fg="#94a3b8", bg="#0f1115").pack(side="left")
+        search_entry = tk.Entry(
+            controls, textvariable=query_var, width=40, bg="#111827", fg="#f8fafc", relief="flat"
+        )
+        search_entry.pack(side="left", padx=6)
+        search_entry.focus_set()
+
+        summary = tk.Label(window, text="", fg="#94a3b8", bg="#0f1115", anchor="w")
+        summary.pack(fill="x", padx=12)
+
+        listbox = tk.Listbox(
+            window,
+            bg="#111827",
+            fg="#e2e8f0",
+            selectbackground="#334155",
+            relief="flat",
+            font=("Courier", 11),
+            activestyle="none",
+        )
+        listbox.pack(fill="both", expand=True, padx=12, pady=8)
+
+        form = tk.Frame(window, bg="#0f1115")
+        form.pack(fill="x", padx=12, pady=8)
+        status = tk.Label(window, text="", fg="#f87171", bg="#0f1115")
         status.pack(pady=4)
 
-        def submit_exit():
-            if entry.get() == self.admin_password:
-                self.set_system_lockdown(False)
-                self.root.destroy()
+        def describe():
+            text = f"{len(library.entries)} executables"
+            if scan["job"] is not None and not scan["job"].done:
+                text += ", scanning libraries..."
+            elif library.visited:
+                text += f", {library.listed} of {library.visited} folders re-read"
+            summary.config(text=text)
+
+        def render():
+            shown[:] = library.search(query_var.get())
+            listbox.delete(0, "end")
+            for entry in shown:
+                listbox.insert("end", f"{entry.title[:27]:<28}{entry.source:<8}{entry.path}")
+            describe()
+
+        def rescan():
+            if scan["job"] is not None and not scan["job"].done:
+                return
+            scan["job"] = LibraryScan(library, parse_library_roots(self.settings)).start()
+            describe()
+            window.after(LIBRARY_POLL_MS, poll)
+
+        def poll():
+            if not window.winfo_exists():
+                return
+            if scan["job"].done:
+                render()
             else:
-                status.config(text="Wrong password")
+                window.after(LIBRARY_POLL_MS, poll)
 
-        submit_btn = self.make_button(
-            dialog,
-            text="Exit App",
-            command=submit_exit,
-            bg="#7f1d1d",
-            fg="#fef2f2",
-            active_bg="#991b1b",
-            active_fg="#fef2f2",
-        )
-        submit_btn.pack(pady=8)
+        def select(_event=None):
+            selection = listbox.curselection()
+            if selection:
+                name_var.set(shown[selection[0]].title)
+
+        def add():
+            selection = listbox.curselection()
+            if not selection:
+                status.config(text="Select an executable", fg="#f87171")
+                return
+            name = name_var.get().strip()
+            if not name:
+                status.config(text="Name required", fg="#f87171")
+                return
+            if any(state.config.name == name for state in self.game_states):
+                status.config(text=f"{name} is already listed", fg="#f87171")
+                return
+            if self.add_custom_game(name, shown[selection[0]].path) is None:
+                status.config(text="Could not save settings", fg="#f87171")
+                return
+            status.config(text=f"Added {name}", fg="#86efac")
+
+        query_var.trace_add("write", lambda *_: render())
+        listbox.bind("<<ListboxSelect>>", select)
+
+        for label_text, command in (("Rescan", rescan), ("Close", window.destroy)):
+            self.make_button(
+                controls,
+                text=label_text,
+                command=command,
+                bg="#1f2937",
+                fg="#e2e8f0",
+                active_bg="#334155",
+                active_fg="#f8fafc",
+            ).pack(side="left", padx=2)
+
+        tk.Label(form, text="Name", fg="#94a3b8", bg="#0f1115").pack(side="left")
+        tk.Entry(
+            form, textvariable=name_var, width=32, bg="#111827", fg="#f8fafc", relief="flat"
+        ).pack(side="left", padx=6)
+        self.make_button(
+            form,
+            text="Add Game",
+            command=add,
+            bg="#065f46",
+            fg="#ecfdf5",
+            active_bg="#047857",
+            active_fg="#ecfdf5",
+        ).pack(side="left", padx=6)
+
+        render()
+        rescan()
 
     def tick(self):
         now = now_ts()
-        soonest = None
+        self.metrics.begin_tick()
+        if self.settings_watcher.poll():
+            self.reload_settings()
+        if self.scanner is not None:
+            self.scanner.refresh([s.pid for s in self.game_states if s.running and s.pid])
+            self.metrics.record_scanner(self.scanner)
+        if self.resource_sampler is not None:
+            self.sample_resources()
 
         for state in self.game_states:
-            if state.running and state.end_ts:
-                if state.config.track_process_state and (not self.is_process_running(state)):
-                    state.status_var.set("Process closed")
-                    state.reset_session()
-                    self.start_cooldown_if_idle()
-                    continue
-                remaining = int(state.end_ts - now)
-                if remaining <= 0:
-                    still_running = (
-                        self.is_process_running(state)
-                        if state.config.kill_process_on_timeout
-                        else False
-                    )
-                    if still_running and state.config.kill_process_on_timeout:
-                        self.kill_game_process(state)
-                    state.status_var.set("Session ended")
-                    state.reset_session()
+            if state.running and state.config.track_process_state:
+                if not self.is_process_running(state):
+                    self.finish_session(state, "Process closed")
                     self.start_cooldown_if_idle()
-                    self.ensure_fullscreen()
-                else:
-                    state.remaining_var.set(self.format_seconds(remaining))
-                    if soonest is None or remaining < soonest:
-                        soonest = remaining
-            elif not state.running:
-                if state.remaining_var.get() == "--:--":
-                    pass
+
+        if day_key(now) != self.allowance_day:
+            self.refresh_allowance()
+        if self.quotas:
+            self.quota_remaining = self.quotas.remaining(now)
+
+        for deadline in self.deadlines.pop_due(now):
+            if deadline.kind == DEADLINE_SESSION_END:
+                self.end_session(deadline.target)
+            elif deadline.kind == DEADLINE_WARNING:
+                self.warning_states.add(deadline.target)
+            elif deadline.kind == DEADLINE_COOLDOWN:
+                self.cooldown_deadline = None
+
+        if self.warning_states:
+            soonest = min(int(state.end_ts - now) for state in self.warning_states)
+            self.update_overlay(max(0, soonest))
+        else:
+            self.update_overlay(None)
+
+        self.apply_lockdown_mode()
+        if self.window_visible:
+            self.render(now)
+        self.metrics.end_tick(max(0, self.cooldown_until - now) if self.cooldown_until else 0)
+        self.tick_job = self.root.after(500, self.tick)
+
+    def render(self, now):
+        for state in self.game_states:
+            if state.running and state.end_ts:
+                state.remaining_var.set(self.format_seconds(max(0, int(state.end_ts - now))))
 
         if self.cooldown_active():
             remaining_cd = self.cooldown_remaining()
@@ -1042,42 +1657,77 @@ class TimerApp:
         else:
             self.cooldown_label.config(text="Cooldown: None")
 
-        if soonest is not None and soonest <= 60:
-            self.update_overlay(soonest)
-        else:
-            self.update_overlay(None)
+        self.update_profile_label()
+        self.render_controls()
 
-        self.refresh_controls()
-        self.root.after(500, self.tick)
+    def end_session(self, state):
+        still_running = (
+            self.is_process_running(state)
+            if state.config.kill_process_on_timeout
+            else False
+        )
+        if still_running and state.config.kill_process_on_timeout:
+            self.kill_game_process(state)
+        self.finish_session(state, "Session ended")
+        self.start_cooldown_if_idle()
+        self.ensure_fullscreen()
 
     def is_process_running(self, state):
         if psutil is None:
             return True
 
-        if state.pid and psutil.pid_exists(state.pid):
-            try:
-                proc = psutil.Process(state.pid)
-                if proc.is_running():
-                    return True
-            except psutil.Error:
-                pass
-
-        identifiers = [i.lower() for i in state.config.identifiers]
-        for proc in psutil.process_iter(["name", "exe", "cmdline"]):
-            try:
-                name = (proc.info.get("name") or "").lower()
-                exe = (proc.info.get("exe") or "").lower()
-                cmd = " ".join(proc.info.get("cmdline") or []).lower()
-                haystack = f"{name} {exe} {cmd}"
-                if any(token in haystack for token in identifiers):
-                    return True
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
+        if self.pid_alive(state):
+            self.update_session_tree(state)
+            return True
 
-        return False
+        started = time.perf_counter()
+        infos = list(self.process_backend.iter_processes())
+        self.update_session_tree(state, infos)
+        match = any(
+            info.pid != self.own_pid and self.owns_process(state, info, loose=True)
+            for info in infos
+        )
+        self.metrics.record_scan(len(infos), time.perf_counter() - started)
+        return match
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="PC Timer")
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="run enforcement as a background daemon without the UI (see headless.py)",
+    )
+    parser.add_argument(
+        "--record-trace",
+        metavar="PATH",
+        help="record tick inputs and user actions to a binary trace for replay",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        metavar="PORT",
+        help="serve OpenMetrics on http://127.0.0.1:PORT/metrics",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        metavar="PATH",
+        help="write OpenMetrics text to PATH every few seconds",
+    )
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
     root = tk.Tk()
     app = TimerApp(root)
+    recorder = None
+    if args.record_trace:
+        recorder = TraceRecorder(args.record_trace)
+        recorder.attach(sys.modules[__name__], app)
+    exporters = start_exporters(app.metrics, args.metrics_port, args.metrics_file)
     root.mainloop()
+    for exporter in exporters:
+        exporter.close()
+    if recorder is not None:
+        recorder.close()
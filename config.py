@@ -0,0 +1,278 @@
+import json
+import os
+import sys
+
+
+COOLDOWN_SECONDS = 60 * 60
+OVERLAY_WARNING_SECONDS = 60
+DEFAULT_SESSION_MINUTES = 40.0
+DEFAULT_SCAN_MAX_STALENESS_SECONDS = 10.0
+
+DEADLINE_SESSION_END = "session_end"
+DEADLINE_WARNING = "warning"
+DEADLINE_COOLDOWN = "cooldown"
+
+
+def user_config_path():
+    if sys.platform.startswith("win"):
+        base_dir = os.environ.get("APPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base_dir = os.path.join(os.path.expanduser("~"), "Library", "Application Support")
+    else:
+        base_dir = os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(base_dir, "PCTimer", "settings.json")
+
+
+def user_history_dir():
+    return os.path.join(os.path.dirname(user_config_path()), "history")
+
+
+def user_profiles_path():
+    return os.path.join(os.path.dirname(user_config_path()), "profiles.sqlite3")
+
+
+def user_snapshot_path():
+    return os.path.join(os.path.dirname(user_config_path()), "session.json")
+
+
+def user_headless_config_path():
+    return os.path.join(os.path.dirname(user_config_path()), "headless.json")
+
+
+def user_library_index_path():
+    return os.path.join(os.path.dirname(user_config_path()), "library.json")
+
+
+def read_settings(config_path):
+    try:
+        with open(config_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (json.JSONDecodeError, OSError):
+        return None
+    if not isinstance(data, dict):
+        return {}
+    return data
+
+
+def parse_game_paths(settings):
+    paths = settings.get("game_paths", {})
+    if not isinstance(paths, dict):
+        return {}
+    cleaned = {}
+    for key, value in paths.items():
+        if isinstance(key, str) and isinstance(value, str) and value.strip():
+            cleaned[key] = value.strip()
+    return cleaned
+
+
+def parse_custom_games(settings):
+    games = settings.get("custom_games", {})
+    if not isinstance(games, dict):
+        return {}
+    return parse_game_paths({"game_paths": games})
+
+
+def parse_library_roots(settings):
+    roots = settings.get("library_roots", [])
+    if not isinstance(roots, list):
+        return []
+    return [root.strip() for root in roots if isinstance(root, str) and root.strip()]
+
+
+def parse_session_minutes(settings):
+    minutes = settings.get("session_minutes", {})
+    if not isinstance(minutes, dict):
+        return {}
+    cleaned = {}
+    for key, value in minutes.items():
+        if isinstance(key, str) and isinstance(value, (int, float)) and value > 0:
+            cleaned[key] = round(float(value), 2)
+    return cleaned
+
+
+def parse_quota_rules(settings):
+    rules = settings.get("quotas", [])
+    if not isinstance(rules, list):
+        return []
+    return [rule for rule in rules if isinstance(rule, dict)]
+
+
+def parse_cooldown_seconds(settings):
+    minutes = settings.get("cooldown_minutes")
+    if isinstance(minutes, (int, float)) and minutes >= 0:
+        return minutes * 60
+    return COOLDOWN_SECONDS
+
+
+def parse_resource_sample_seconds(settings):
+    seconds = settings.get("resource_sample_seconds")
+    if isinstance(seconds, (int, float)) and seconds > 0:
+        return float(seconds)
+    return None
+
+
+def parse_scan_budget(settings):
+    budget_ms = settings.get("scan_budget_ms")
+    if not isinstance(budget_ms, (int, float)) or budget_ms <= 0:
+        return None, None
+    max_staleness = settings.get("scan_max_staleness_seconds")
+    if not isinstance(max_staleness, (int, float)) or max_staleness <= 0:
+        max_staleness = DEFAULT_SCAN_MAX_STALENESS_SECONDS
+    return budget_ms / 1000, float(max_staleness)
+
+
+def platform_name():
+    if sys.platform.startswith("win"):
+        return "windows"
+    if sys.platform == "darwin":
+        return "mac"
+    return "other"
+
+
+class GameConfig:
+    __slots__ = (
+        "name",
+        "identifiers",
+        "path_candidates",
+        "kill_process_on_timeout",
+        "track_process_state",
+    )
+
+    def __init__(
+        self,
+        name,
+        identifiers,
+        path_candidates,
+        kill_process_on_timeout=True,
+        track_process_state=True,
+    ):
+        self.name = name
+        self.identifiers = identifiers
+        self.path_candidates = path_candidates
+        self.kill_process_on_timeout = kill_process_on_timeout
+        self.track_process_state = track_process_state
+
+
+def windows_xbox_roots():
+    roots = []
+    seen_roots = set()
+
+    for letter in "CDEFGHIJKLMNOPQRSTUVWXYZ":
+        drive = f"{letter}:\\"
+        xbox_root = os.path.join(drive, "XboxGames")
+        gaming_root_flag = os.path.join(drive, ".GamingRoot")
+        if os.path.isdir(xbox_root) or os.path.isfile(gaming_root_flag):
+            normalized = os.path.normcase(os.path.normpath(xbox_root))
+            if normalized not in seen_roots:
+                seen_roots.add(normalized)
+                roots.append(xbox_root)
+    return roots
+
+
+def discover_windows_xbox_minecraft_paths():
+    roots = windows_xbox_roots() or [r"C:\XboxGames"]
+
+    found = []
+    seen_paths = set()
+
+    def add_if_exists(path):
+        if not os.path.exists(path):
+            return
+        normalized = os.path.normcase(os.path.normpath(path))
+        if normalized in seen_paths:
+            return
+        seen_paths.add(normalized)
+        found.append(path)
+
+    preferred_rel_paths = [
+        os.path.join("Minecraft Launcher", "Content", "MinecraftLauncher.exe"),
+        os.path.join("Minecraft Launcher", "Content", "Minecraft.exe"),
+        os.path.join("Minecraft", "Content", "MinecraftLauncher.exe"),
+        os.path.join("Minecraft", "Content", "Minecraft.exe"),
+    ]
+
+    for root in roots:
+        for rel_path in preferred_rel_paths:
+            add_if_exists(os.path.join(root, rel_path))
+
+    targets = {"minecraftlauncher.exe", "minecraft.exe"}
+    for root in roots:
+        if not os.path.isdir(root):
+            continue
+        for dirpath, dirnames, filenames in os.walk(root):
+            rel = os.path.relpath(dirpath, root)
+            depth = 0 if rel == "." else rel.count(os.sep) + 1
+            if depth > 5:
+                dirnames[:] = []
+                continue
+            for filename in filenames:
+                if filename.lower() in targets:
+                    add_if_exists(os.path.join(dirpath, filename))
+            if len(found) >= 8:
+                return found
+    return found
+
+
+def default_games():
+    system = platform_name()
+    chrome_paths = []
+    minecraft_paths = []
+
+    if system == "windows":
+        chrome_paths = [
+            r"C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe",
+            r"C:\\Program Files (x86)\\Google\\Chrome\\Application\\chrome.exe",
+        ]
+        minecraft_paths = discover_windows_xbox_minecraft_paths() + [
+            r"C:\\XboxGames\\Minecraft Launcher\\Content\\MinecraftLauncher.exe",
+            r"C:\\XboxGames\\Minecraft Launcher\\Content\\Minecraft.exe",
+            r"C:\\XboxGames\\Minecraft\\Content\\MinecraftLauncher.exe",
+            r"C:\\XboxGames\\Minecraft\\Content\\Minecraft.exe",
+            r"C:\\Program Files (x86)\\Minecraft Launcher\\MinecraftLauncher.exe",
+            r"C:\\Program Files\\Minecraft Launcher\\MinecraftLauncher.exe",
+        ]
+    elif system == "mac":
+        chrome_paths = [
+            "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+        ]
+        minecraft_paths = [
+            "/Applications/Minecraft.app/Contents/MacOS/Minecraft",
+            "/Applications/Minecraft Launcher.app/Contents/MacOS/Minecraft Launcher",
+        ]
+
+    games = [
+        GameConfig(
+            name="Minecraft",
+            identifiers=["minecraft", "javaw", "minecraftlauncher"],
+            path_candidates=minecraft_paths,
+            kill_process_on_timeout=True,
+            track_process_state=True,
+        ),
+        GameConfig(
+            name="Chrome",
+            identifiers=["chrome", "google chrome"],
+            path_candidates=chrome_paths,
+            kill_process_on_timeout=False,
+            track_process_state=False,
+        ),
+    ]
+
+    return games
+
+
+def custom_game_config(name, path):
+    # No identifiers: a custom game is matched only through its indexed
+    # executable, since a file stem is far too common a substring.
+    return GameConfig(
+        name=name,
+        identifiers=[],
+        path_candidates=[path],
+        kill_process_on_timeout=True,
+        track_process_state=True,
+    )
+
+
+def custom_games(settings):
+    return [custom_game_config(name, path) for name, path in parse_custom_games(settings).items()]
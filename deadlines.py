@@ -0,0 +1,57 @@
+import heapq
+import itertools
+
+
+class Deadline:
+    __slots__ = ("when", "kind", "target", "active")
+
+    def __init__(self, when, kind, target):
+        self.when = when
+        self.kind = kind
+        self.target = target
+        self.active = True
+
+
+class DeadlineQueue:
+    def __init__(self):
+        self._heap = []
+        self._counter = itertools.count()
+        self._cancelled = 0
+
+    def __len__(self):
+        return len(self._heap) - self._cancelled
+
+    def schedule(self, when, kind, target=None):
+        deadline = Deadline(when, kind, target)
+        heapq.heappush(self._heap, (when, next(self._counter), deadline))
+        return deadline
+
+    def cancel(self, deadline):
+        if deadline is None or not deadline.active:
+            return
+        deadline.active = False
+        deadline.target = None
+        self._cancelled += 1
+        if self._cancelled > 64 and self._cancelled * 2 > len(self._heap):
+            self._heap = [entry for entry in self._heap if entry[2].active]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
+
+    def next_deadline(self):
+        heap = self._heap
+        while heap and not heap[0][2].active:
+            heapq.heappop(heap)
+            self._cancelled -= 1
+        return heap[0][0] if heap else None
+
+    def pop_due(self, now):
+        due = []
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            deadline = heapq.heappop(heap)[2]
+            if not deadline.active:
+                self._cancelled -= 1
+                continue
+            deadline.active = False
+            due.append(deadline)
+        return due
@@ -0,0 +1,563 @@
+import json
+import os
+import platform
+import time
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from analytics import SessionHistory
+from config import (
+    DEADLINE_COOLDOWN,
+    DEADLINE_SESSION_END,
+    DEADLINE_WARNING,
+    OVERLAY_WARNING_SECONDS,
+    custom_games,
+    parse_cooldown_seconds,
+    parse_game_paths,
+    parse_quota_rules,
+    parse_resource_sample_seconds,
+    parse_scan_budget,
+    user_history_dir,
+    user_profiles_path,
+    user_snapshot_path,
+)
+from deadlines import DeadlineQueue
+from exe_index import ExecutableIndex
+from metrics import EnforcementMetrics
+from profiles import ProfileStore, day_key
+from quotas import QuotaEngine
+from resources import MAX_TREE_PROCESSES, ResourceSampler, proc_children_available, proc_tree
+from scanner import BudgetedScanner
+
+KILL_GRACE_SECONDS = 2
+
+BLOCKED_DAILY_LIMIT = "daily limit"
+BLOCKED_QUOTA = "quota"
+# The quota has time left, but running sessions will use it up, so there is no
+# reset time to show yet.
+BLOCKED_QUOTA_RUNNING = "quota used by running sessions"
+
+
+# Session, cooldown, allowance, quota and snapshot handling shared by the Tk UI
+# and the headless daemon. Subclasses own the game states (config, path,
+# running, pid, process, start/end timestamps, deadlines and resources) and
+# provide add_game_state(); session_status() is their hook for status changes.
+class EnforcementCore:
+    def __init__(self, settings, process_backend):
+        self.settings = settings
+        self.saved_paths = parse_game_paths(settings)
+        self.cooldown_seconds = parse_cooldown_seconds(settings)
+        self.cooldown_until = None
+        self.cooldown_deadline = None
+        self.deadlines = DeadlineQueue()
+        self.game_states = []
+        self.process_backend = process_backend
+        self.scanner = None
+        self.configure_scanner()
+        self.resource_sampler = None
+        self.configure_sampler()
+        self.metrics = EnforcementMetrics()
+        self.exe_index = ExecutableIndex()
+        self.exe_index_dirty = True
+        self.own_pid = os.getpid()
+        self.proc_children = proc_children_available()
+        self.station_name = platform.node() or "station"
+        self.history = SessionHistory(user_history_dir())
+        self.profile_store = self.open_profile_store()
+        self.profile = self.select_profile()
+        self.allowance_day = None
+        self.allowance_remaining = None
+        self.quota_rules = parse_quota_rules(settings)
+        self.quotas = QuotaEngine()
+        self.quota_remaining = None
+        self.load_profile_state()
+
+    def now(self):
+        return time.time()
+
+    def session_status(self, state, text):
+        return
+
+    def open_profile_store(self):
+        try:
+            os.makedirs(os.path.dirname(user_profiles_path()), exist_ok=True)
+        except OSError:
+            return ProfileStore(":memory:")
+        return ProfileStore(user_profiles_path())
+
+    def select_profile(self):
+        return self.profile_store.active_profile()
+
+    def load_profile_state(self):
+        self.cooldown_until = self.profile.cooldown_until
+        self.deadlines.cancel(self.cooldown_deadline)
+        self.cooldown_deadline = None
+        if self.cooldown_active():
+            self.cooldown_deadline = self.deadlines.schedule(
+                self.cooldown_until, DEADLINE_COOLDOWN
+            )
+        self.load_quotas()
+        self.refresh_allowance()
+
+    def load_quotas(self):
+        now = self.now()
+        self.quotas = QuotaEngine(self.quota_rules)
+        if self.quotas:
+            self.quotas.seed(
+                self.profile_store.sessions_since(self.profile, now - self.quotas.lookback_seconds())
+            )
+        self.quota_remaining = self.quotas.remaining(now)
+
+    def play_budget(self):
+        budget = self.allowance_remaining
+        if self.quota_remaining is not None and (budget is None or self.quota_remaining < budget):
+            budget = self.quota_remaining
+        return budget
+
+    def refresh_allowance(self):
+        self.allowance_day = day_key(self.now())
+        self.allowance_remaining = self.profile_store.remaining_allowance(
+            self.profile, self.allowance_day
+        )
+
+    def apply_settings(self, settings):
+        self.settings = settings
+        names = {state.config.name for state in self.game_states}
+        for config in custom_games(settings):
+            if config.name not in names:
+                self.add_game_state(config)
+        quota_rules = parse_quota_rules(settings)
+        if quota_rules != self.quota_rules:
+            self.quota_rules = quota_rules
+            self.load_quotas()
+        self.cooldown_seconds = parse_cooldown_seconds(settings)
+        self.configure_scanner()
+        self.configure_sampler()
+
+    def configure_scanner(self):
+        budget, max_staleness = parse_scan_budget(self.settings)
+        if budget is None:
+            if self.scanner is not None:
+                self.process_backend = self.scanner.backend
+                self.scanner = None
+            return
+        if self.scanner is not None:
+            self.scanner.configure(budget, max_staleness)
+            return
+        # With the proc connector the table is already kept current by events.
+        if getattr(self.process_backend, "connector", None) is not None:
+            return
+        self.scanner = BudgetedScanner(self.process_backend, budget, max_staleness)
+        self.process_backend = self.scanner
+
+    def configure_sampler(self):
+        interval = parse_resource_sample_seconds(self.settings)
+        if interval is None or psutil is None:
+            self.resource_sampler = None
+        elif self.resource_sampler is None:
+            self.resource_sampler = ResourceSampler(interval)
+        else:
+            self.resource_sampler.interval = interval
+
+    def sample_resources(self):
+        if not self.resource_sampler.due():
+            return
+        for state in self.game_states:
+            if state.running and state.pid:
+                self.resource_sampler.sample(state.resources, state.pid)
+
+    def cooldown_active(self):
+        return self.cooldown_until is not None and self.now() < self.cooldown_until
+
+    def cooldown_remaining(self):
+        if not self.cooldown_until:
+            return 0
+        return max(0, int(self.cooldown_until - self.now()))
+
+    def any_game_running(self):
+        return any(state.running for state in self.game_states)
+
+    def planned_seconds(self):
+        return sum(s.end_ts - s.start_ts for s in self.game_states if s.running and s.end_ts)
+
+    def session_budget(self, duration, now):
+        # Caps a requested duration to what the allowance and quotas leave
+        # after the sessions already running; returns (duration, blocked).
+        if self.quotas:
+            self.quota_remaining = self.quotas.remaining(now)
+        budget = self.play_budget()
+        if budget is None:
+            return duration, None
+        planned = self.planned_seconds()
+        available = budget - planned
+        if available < 1:
+            if budget == self.allowance_remaining:
+                return 0, BLOCKED_DAILY_LIMIT
+            if planned > 0:
+                return 0, BLOCKED_QUOTA_RUNNING
+            return 0, BLOCKED_QUOTA
+        return min(duration, available), None
+
+    def start_cooldown_if_idle(self):
+        if not self.any_game_running():
+            self.start_cooldown()
+
+    def start_cooldown(self, since=None):
+        self.cooldown_until = (self.now() if since is None else since) + self.cooldown_seconds
+        self.deadlines.cancel(self.cooldown_deadline)
+        self.cooldown_deadline = self.deadlines.schedule(
+            self.cooldown_until, DEADLINE_COOLDOWN
+        )
+        self.profile_store.set_cooldown(self.profile, self.cooldown_until)
+        self.save_session_snapshot()
+
+    def clear_cooldown(self):
+        self.cooldown_until = None
+        self.deadlines.cancel(self.cooldown_deadline)
+        self.cooldown_deadline = None
+        self.profile_store.set_cooldown(self.profile, None)
+        self.save_session_snapshot()
+
+    def begin_session(self, state, popen, pid, start_ts, end_ts):
+        state.running = True
+        state.popen = popen
+        state.pid = pid
+        state.start_ts = start_ts
+        state.end_ts = end_ts
+        state.resources.reset()
+        self.metrics.sessions_started.inc(label_value=state.config.name)
+        state.end_deadline = self.deadlines.schedule(
+            state.end_ts, DEADLINE_SESSION_END, state
+        )
+        state.warning_deadline = self.deadlines.schedule(
+            state.end_ts - OVERLAY_WARNING_SECONDS, DEADLINE_WARNING, state
+        )
+
+    def finish_session(self, state, reason):
+        self.session_status(state, reason)
+        self.metrics.sessions_ended.inc(label_value=reason)
+        self.record_session(state, reason)
+        self.deadlines.cancel(state.end_deadline)
+        self.deadlines.cancel(state.warning_deadline)
+        state.end_deadline = None
+        state.warning_deadline = None
+        state.reset_session()
+        self.save_session_snapshot()
+
+    def record_session(self, state, reason):
+        if state.start_ts is None:
+            return
+        # Time after the session's end (e.g. while the app was not running)
+        # is not play time.
+        end_ts = self.now()
+        if state.end_ts is not None:
+            end_ts = min(end_ts, state.end_ts)
+        duration = max(0.0, end_ts - state.start_ts)
+        self.profile_store.record_session(
+            self.profile,
+            state.start_ts,
+            duration,
+            state.config.name,
+            reason,
+            state.resources.summary(),
+        )
+        if self.quotas:
+            self.quotas.add(state.start_ts, state.start_ts + duration)
+            self.quota_remaining = self.quotas.remaining(state.start_ts + duration)
+        self.refresh_allowance()
+        try:
+            self.history.append(
+                state.start_ts, duration, state.config.name, self.station_name, reason
+            )
+        except OSError:
+            return
+
+    def save_session_snapshot(self):
+        games = {}
+        for state in self.game_states:
+            if not state.running:
+                continue
+            create_time = None
+            proc = self.tracked_process(state) if psutil is not None else None
+            if proc is not None:
+                try:
+                    create_time = proc.create_time()
+                except psutil.Error:
+                    create_time = None
+            games[state.config.name] = {
+                "pid": state.pid,
+                "create_time": create_time,
+                "start_ts": state.start_ts,
+                "end_ts": state.end_ts,
+                "path": state.path,
+            }
+        payload = {
+            "profile_id": self.profile.id,
+            "cooldown_until": self.cooldown_until,
+            "games": games,
+        }
+        snapshot_path = user_snapshot_path()
+        temp_path = f"{snapshot_path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=True)
+            os.replace(temp_path, snapshot_path)
+        except OSError:
+            return
+
+    def load_session_snapshot(self):
+        try:
+            with open(user_snapshot_path(), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError, OSError):
+            return None
+        if not isinstance(data, dict) or not isinstance(data.get("games"), dict):
+            return None
+        return data
+
+    def verify_snapshot_process(self, pid, create_time):
+        if psutil is None or not isinstance(pid, int) or create_time is None:
+            return None
+        try:
+            proc = psutil.Process(pid)
+            if abs(proc.create_time() - create_time) > 0.01:
+                return None
+        except psutil.Error:
+            return None
+        return proc
+
+    def restore_session_snapshot(self):
+        data = self.load_session_snapshot()
+        if data is None:
+            return []
+        if data.get("profile_id") == self.profile.id:
+            cooldown_until = data.get("cooldown_until")
+            if isinstance(cooldown_until, (int, float)) and (
+                self.cooldown_until is None or cooldown_until > self.cooldown_until
+            ):
+                self.cooldown_until = cooldown_until
+                self.deadlines.cancel(self.cooldown_deadline)
+                self.cooldown_deadline = self.deadlines.schedule(
+                    cooldown_until, DEADLINE_COOLDOWN
+                )
+
+        now = self.now()
+        resumed = []
+        ended = None
+        closed = False
+        infos = None
+        for state in self.game_states:
+            entry = data["games"].get(state.config.name)
+            if not isinstance(entry, dict) or state.running:
+                continue
+            start_ts = entry.get("start_ts")
+            end_ts = entry.get("end_ts")
+            if not isinstance(start_ts, (int, float)) or not isinstance(end_ts, (int, float)):
+                continue
+            path = entry.get("path")
+            if isinstance(path, str) and path:
+                state.path = path
+            proc = self.verify_snapshot_process(entry.get("pid"), entry.get("create_time"))
+            if end_ts <= now:
+                # The session ran out while nothing was enforcing it: end it
+                # at end_ts and let the cooldown count from then.
+                state.start_ts = start_ts
+                state.end_ts = end_ts
+                state.pid = proc.pid if proc else None
+                state.process = proc
+                if proc is not None:
+                    self.kill_game_process(state)
+                self.finish_session(state, "Session ended")
+                ended = end_ts if ended is None else max(ended, end_ts)
+                continue
+            pid = proc.pid if proc else None
+            if proc is None:
+                # The pid could not be verified, so look the game up in a full
+                # read of the process table now; a budgeted tick may only see
+                # part of it.
+                if infos is None:
+                    infos = list(self.process_backend.iter_processes())
+                pid, found = self.find_game_process(state, infos)
+                if not found:
+                    self.begin_session(state, None, None, start_ts, end_ts)
+                    self.finish_session(state, "Process closed")
+                    closed = True
+                    continue
+            self.begin_session(state, None, pid, start_ts, end_ts)
+            state.process = proc
+            resumed.append(state)
+
+        if closed and ended is None:
+            self.start_cooldown_if_idle()
+        if ended is not None and not self.any_game_running():
+            cooldown_until = ended + self.cooldown_seconds
+            if cooldown_until > now and (
+                self.cooldown_until is None or cooldown_until > self.cooldown_until
+            ):
+                self.start_cooldown(since=ended)
+        return resumed
+
+    def find_game_process(self, state, infos):
+        # Returns (pid, found): the pid of a process that may be killed, and
+        # whether any process, including a loose match, belongs to the game.
+        found = False
+        for info in infos:
+            if info.pid == self.own_pid:
+                continue
+            if self.owns_process(state, info):
+                return info.pid, True
+            found = found or self.owns_process(state, info, loose=True)
+        return None, found
+
+    def tracked_process(self, state):
+        if not state.pid:
+            return None
+        proc = state.process
+        if proc is None or proc.pid != state.pid:
+            try:
+                proc = psutil.Process(state.pid)
+            except psutil.Error:
+                proc = None
+            state.process = proc
+        return proc
+
+    def pid_alive(self, state):
+        proc = self.tracked_process(state)
+        if proc is None:
+            return False
+        try:
+            return proc.is_running()
+        except psutil.Error:
+            return False
+
+    def game_paths(self, state):
+        name = state.config.name
+        paths = [state.path, self.saved_paths.get(name, "")]
+        paths.extend(state.config.path_candidates)
+        return paths
+
+    def rebuild_exe_index(self):
+        game_paths = {}
+        for state in self.game_states:
+            game_paths[state.config.name] = self.game_paths(state)
+        self.exe_index.rebuild(game_paths)
+        self.exe_index_dirty = False
+
+    def game_for_process(self, info):
+        if self.exe_index_dirty:
+            self.rebuild_exe_index()
+        return self.exe_index.lookup(info.exe)
+
+    def update_session_tree(self, state, infos=None):
+        # The tracked pid and every process started under it belong to the
+        # session, also after their parent exits (a launcher handing off to
+        # the game). Without a process table the tree is only refreshed
+        # where /proc lists children; elsewhere that would scan every process.
+        roots = set(state.tree_pids)
+        if state.pid:
+            roots.add(state.pid)
+        if infos is None:
+            if self.proc_children and roots:
+                state.tree_pids = self.proc_session_tree(roots)
+            return state.tree_pids
+        children = {}
+        alive = set()
+        for info in infos:
+            alive.add(info.pid)
+            if info.ppid:
+                children.setdefault(info.ppid, []).append(info.pid)
+        # A dead root is still walked: on Windows its children keep its pid
+        # as their parent.
+        tree = set()
+        seen = set(roots)
+        stack = list(roots)
+        while stack and len(tree) < MAX_TREE_PROCESSES:
+            pid = stack.pop()
+            if pid in alive:
+                tree.add(pid)
+            for child in children.get(pid, ()):
+                if child not in seen:
+                    seen.add(child)
+                    stack.append(child)
+        state.tree_pids = tree
+        return tree
+
+    def proc_session_tree(self, roots):
+        alive = [pid for pid in roots if os.path.exists(f"/proc/{pid}")]
+        return set(proc_tree(alive))
+
+    def owns_process(self, state, info, loose=False):
+        # The session's process tree always counts. Otherwise an indexed
+        # executable decides the game, and an unindexed one falls back to
+        # the identifiers: an exact process name, or with loose=True an
+        # identifier anywhere in the command line. A loose match is enough
+        # to keep a session running but never to kill.
+        if info.pid in state.tree_pids:
+            return True
+        game = self.game_for_process(info)
+        if game is not None:
+            return game == state.config.name
+        identifiers = [i.lower() for i in state.config.identifiers]
+        return info.matches(identifiers) if loose else info.is_named(identifiers)
+
+    def kill_game_process(self, state):
+        if psutil is None:
+            return
+        if not state.config.kill_process_on_timeout:
+            return
+
+        started = time.perf_counter()
+        targets = {}
+        proc = self.tracked_process(state)
+        if proc is not None:
+            targets[proc.pid] = proc
+
+        infos = list(self.process_backend.iter_processes())
+        scanned = len(infos)
+        self.update_session_tree(state, infos)
+        for info in infos:
+            if info.pid == self.own_pid or info.pid in targets:
+                continue
+            if not self.owns_process(state, info):
+                continue
+            try:
+                targets[info.pid] = psutil.Process(info.pid)
+            except psutil.Error:
+                continue
+        self.metrics.record_scan(scanned, time.perf_counter() - started)
+        self.terminate_processes(list(targets.values()), started)
+
+    def kill_processes(self, pids):
+        if psutil is None:
+            return
+        started = time.perf_counter()
+        targets = []
+        for pid in pids:
+            if pid == self.own_pid:
+                continue
+            try:
+                targets.append(psutil.Process(pid))
+            except psutil.Error:
+                continue
+        self.terminate_processes(targets, started)
+
+    def terminate_processes(self, targets, started):
+        for proc in targets:
+            try:
+                proc.terminate()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+
+        gone, alive = psutil.wait_procs(targets, timeout=KILL_GRACE_SECONDS)
+        for proc in alive:
+            try:
+                proc.kill()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        self.metrics.kills.inc(len(gone), "terminated")
+        self.metrics.kills.inc(len(alive), "killed")
+        self.metrics.kill_seconds.observe(time.perf_counter() - started)
@@ -0,0 +1,84 @@
+import os
+
+LOOKUP_CACHE_LIMIT = 4096
+
+
+def normalize_path(path):
+    return os.path.normcase(os.path.normpath(path))
+
+
+def file_identity(path):
+    # st_ino/st_dev are the inode and device on POSIX and the file ID and
+    # volume serial number on Windows.
+    try:
+        st = os.stat(path)
+    except (OSError, ValueError):
+        return None
+    if not st.st_ino:
+        return None
+    return (st.st_dev, st.st_ino)
+
+
+def bundle_root(path):
+    marker = path.find(".app" + os.sep)
+    if marker < 0:
+        return path if path.endswith(".app") else None
+    return path[: marker + 4]
+
+
+class ExecutableIndex:
+    def __init__(self):
+        self.by_path = {}
+        self.by_identity = {}
+        self.by_bundle = {}
+        self._cache = {}
+
+    def __len__(self):
+        return len(self.by_path)
+
+    def rebuild(self, game_paths):
+        self.by_path = {}
+        self.by_identity = {}
+        self.by_bundle = {}
+        self._cache = {}
+        for game, paths in game_paths.items():
+            for path in paths:
+                if path:
+                    self.add(game, path)
+
+    def add(self, game, path):
+        path = path.strip()
+        if not path or not os.path.exists(path):
+            return
+        real = normalize_path(os.path.realpath(path))
+        self.by_path.setdefault(real, game)
+        self.by_path.setdefault(normalize_path(path), game)
+        identity = file_identity(real)
+        if identity is not None and not os.path.isdir(real):
+            self.by_identity.setdefault(identity, game)
+        bundle = bundle_root(real)
+        if bundle is not None:
+            self.by_bundle.setdefault(bundle, game)
+        self._cache = {}
+
+    def lookup(self, exe):
+        if not exe:
+            return None
+        try:
+            return self._cache[exe]
+        except KeyError:
+            pass
+        normalized = normalize_path(exe)
+        game = self.by_path.get(normalized)
+        if game is None and self.by_bundle:
+            bundle = bundle_root(normalized)
+            if bundle is not None:
+                game = self.by_bundle.get(bundle)
+        if game is None and self.by_identity:
+            identity = file_identity(exe)
+            if identity is not None:
+                game = self.by_identity.get(identity)
+        if len(self._cache) >= LOOKUP_CACHE_LIMIT:
+            self._cache = {}
+        self._cache[exe] = game
+        return game
@@ -0,0 +1,447 @@
+import argparse
+import json
+import logging
+import signal
+import sys
+import time
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from config import (
+    DEADLINE_COOLDOWN,
+    DEADLINE_SESSION_END,
+    DEADLINE_WARNING,
+    DEFAULT_SESSION_MINUTES,
+    custom_games,
+    default_games,
+    parse_game_paths,
+    parse_session_minutes,
+    read_settings,
+    user_config_path,
+    user_headless_config_path,
+)
+from enforcement import BLOCKED_QUOTA, EnforcementCore
+from metrics import start_exporters
+from process_backend import create_process_backend
+from profiles import day_key
+from resources import ResourceRing
+from watcher import FileWatcher
+
+TICK_SECONDS = 1.0
+
+log = logging.getLogger("pctimer.headless")
+
+
+def load_options(path):
+    options = {
+        "tick_seconds": TICK_SECONDS,
+        "cooldown_minutes": None,
+        "profile": None,
+        "games": {},
+    }
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return options
+    except (json.JSONDecodeError, OSError) as exc:
+        log.warning("Ignoring %s: %s", path, exc)
+        return options
+    if not isinstance(data, dict):
+        return options
+
+    value = data.get("tick_seconds")
+    if isinstance(value, (int, float)) and value > 0:
+        options["tick_seconds"] = float(value)
+    # Same rule as settings.json: 0 turns the cooldown off.
+    value = data.get("cooldown_minutes")
+    if isinstance(value, (int, float)) and value >= 0:
+        options["cooldown_minutes"] = float(value)
+    if isinstance(data.get("profile"), str):
+        options["profile"] = data["profile"]
+    games = data.get("games")
+    if isinstance(games, dict):
+        for name, entry in games.items():
+            if not isinstance(entry, dict):
+                continue
+            cleaned = {}
+            minutes = entry.get("minutes")
+            if isinstance(minutes, (int, float)) and minutes > 0:
+                cleaned["minutes"] = float(minutes)
+            path = entry.get("path")
+            if isinstance(path, str) and path.strip():
+                cleaned["path"] = path.strip()
+            options["games"][name] = cleaned
+    return options
+
+
+class HeadlessGame:
+    __slots__ = (
+        "config",
+        "identifiers",
+        "minutes",
+        "path",
+        "running",
+        "popen",
+        "pid",
+        "process",
+        "start_ts",
+        "end_ts",
+        "end_deadline",
+        "warning_deadline",
+        "resources",
+        "tree_pids",
+        "pending_path",
+    )
+
+    def __init__(self, config):
+        self.config = config
+        self.identifiers = [i.lower() for i in config.identifiers]
+        self.minutes = DEFAULT_SESSION_MINUTES
+        self.path = ""
+        self.running = False
+        self.popen = None
+        self.pid = None
+        self.process = None
+        self.start_ts = None
+        self.end_ts = None
+        self.end_deadline = None
+        self.warning_deadline = None
+        self.resources = ResourceRing()
+        self.tree_pids = set()
+        self.pending_path = None
+
+    def reset_session(self):
+        self.running = False
+        self.popen = None
+        self.pid = None
+        self.process = None
+        self.tree_pids = set()
+        self.start_ts = None
+        self.end_ts = None
+
+
+class HeadlessTimer(EnforcementCore):
+    def __init__(self, options_path=None):
+        self.options_path = options_path or user_headless_config_path()
+        self.options = load_options(self.options_path)
+        super().__init__(read_settings(user_config_path()) or {}, create_process_backend())
+        # Games whose process state cannot be tracked are timer-only in the UI
+        # and have nothing to enforce without it.
+        for config in default_games() + custom_games(self.settings):
+            self.add_game_state(config)
+        self.settings_watcher = FileWatcher([self.options_path, user_config_path()])
+        self.stopping = False
+        self.reload_requested = False
+        self.reset_requested = False
+        self.status_requested = False
+
+        self.apply_options()
+        for game in self.restore_session_snapshot():
+            log.info("%s resumed from snapshot", game.config.name)
+
+    def select_profile(self):
+        name = self.options["profile"]
+        profile = self.profile_store.find_profile(name) if name else None
+        if name and profile is None:
+            log.warning("Unknown profile %r, using the active profile", name)
+        return profile or self.profile_store.active_profile()
+
+    def session_status(self, game, text):
+        log.info("%s: %s", game.config.name, text)
+
+    def add_game_state(self, config):
+        if config.track_process_state:
+            self.game_states.append(HeadlessGame(config))
+            self.exe_index_dirty = True
+
+    def apply_options(self):
+        # headless.json overrides settings.json per game and for the cooldown.
+        session_minutes = parse_session_minutes(self.settings)
+        for game in self.game_states:
+            name = game.config.name
+            entry = self.options["games"].get(name, {})
+            game.minutes = entry.get("minutes", session_minutes.get(name, DEFAULT_SESSION_MINUTES))
+            path = entry.get("path") or self.saved_paths.get(name, "")
+            # A running game keeps its path until the session ends; minutes
+            # are only read when a session starts.
+            if game.running:
+                game.pending_path = path if path != game.path else None
+            else:
+                game.path = path
+        if self.options["cooldown_minutes"] is not None:
+            self.cooldown_seconds = self.options["cooldown_minutes"] * 60
+        self.exe_index_dirty = True
+
+    def reload(self):
+        self.options = load_options(self.options_path)
+        settings = read_settings(user_config_path())
+        if settings is not None:
+            self.saved_paths = parse_game_paths(settings)
+            self.apply_settings(settings)
+        profile = self.select_profile()
+        if profile.id != self.profile.id and not self.any_game_running():
+            self.profile = profile
+            self.load_profile_state()
+        self.apply_options()
+        log.info("Reloaded %s", self.options_path)
+
+    def scan(self):
+        # Maps each game to (pid, confirmed) pairs. A running session's process
+        # tree and indexed executables are confirmed; other processes fall
+        # back to the identifiers, where only exact process names count as
+        # confirmed. Unconfirmed pids are never killed.
+        matches = {}
+        started = time.perf_counter()
+        infos = list(self.process_backend.iter_processes())
+        owners = {}
+        for game in self.game_states:
+            if game.running:
+                for pid in self.update_session_tree(game, infos):
+                    owners[pid] = game.config.name
+        for info in infos:
+            if info.pid == self.own_pid:
+                continue
+            name = owners.get(info.pid) or self.game_for_process(info)
+            confirmed = name is not None
+            if name is None:
+                for game in self.game_states:
+                    if info.matches(game.identifiers):
+                        name = game.config.name
+                        confirmed = info.is_named(game.identifiers)
+                        break
+            if name is not None:
+                matches.setdefault(name, []).append((info.pid, confirmed))
+        self.metrics.record_scan(len(infos), time.perf_counter() - started)
+        return matches
+
+    def tick(self):
+        now = self.now()
+        self.metrics.begin_tick()
+        if self.scanner is not None:
+            self.scanner.refresh([game.pid for game in self.game_states if game.running and game.pid])
+            self.metrics.record_scanner(self.scanner)
+        matches = self.scan()
+        if self.resource_sampler is not None:
+            self.sample_resources()
+
+        for game in self.game_states:
+            found = matches.get(game.config.name)
+            if game.running:
+                if not found:
+                    self.finish_session(game, "Process closed")
+                    self.start_cooldown_if_idle()
+            elif found:
+                self.admit(game, found, now)
+
+        if day_key(now) != self.allowance_day:
+            self.refresh_allowance()
+
+        for deadline in self.deadlines.pop_due(now):
+            if deadline.kind == DEADLINE_SESSION_END:
+                self.end_session(deadline.target)
+            elif deadline.kind == DEADLINE_WARNING:
+                game = deadline.target
+                log.info("%s: %d seconds left", game.config.name, max(0, int(game.end_ts - now)))
+            elif deadline.kind == DEADLINE_COOLDOWN:
+                self.cooldown_deadline = None
+                log.info("Cooldown over")
+
+        self.metrics.end_tick(max(0, self.cooldown_until - now) if self.cooldown_until else 0)
+
+    def admit(self, game, found, now):
+        if self.cooldown_active():
+            duration, reason = 0, "cooldown"
+        else:
+            duration, reason = self.session_budget(game.minutes * 60, now)
+        if reason == BLOCKED_QUOTA:
+            next_ts = self.quotas.next_allowed(now)
+            reason = f"quota until {time.strftime('%a %H:%M', time.localtime(next_ts))}"
+
+        if reason is not None:
+            if game.config.kill_process_on_timeout:
+                pids = [pid for pid, confirmed in found if confirmed]
+                if pids:
+                    log.info("%s blocked (%s), killing %d process(es)", game.config.name, reason, len(pids))
+                    self.kill_processes(pids)
+                else:
+                    log.debug("%s blocked (%s), no confirmed process to kill", game.config.name, reason)
+            return
+
+        # An unconfirmed match starts the session but is not tracked, so the
+        # session end never kills it.
+        pid = next((pid for pid, confirmed in found if confirmed), None)
+        self.begin_session(game, None, pid, now, now + duration)
+        log.info("%s started, %d seconds allowed", game.config.name, int(duration))
+        self.save_session_snapshot()
+
+    def end_session(self, game):
+        self.kill_game_process(game)
+        self.finish_session(game, "Session ended")
+        self.start_cooldown_if_idle()
+
+    def finish_session(self, game, reason):
+        super().finish_session(game, reason)
+        if game.pending_path is not None:
+            game.path = game.pending_path
+            game.pending_path = None
+            self.exe_index_dirty = True
+
+    def record_session(self, game, reason):
+        super().record_session(game, reason)
+        resources = game.resources.summary()
+        if resources is not None:
+            log.info("%s resources: %s", game.config.name, resources.describe())
+
+    def start_cooldown(self, since=None):
+        super().start_cooldown(since)
+        log.info("Cooldown until %s", time.strftime("%H:%M:%S", time.localtime(self.cooldown_until)))
+
+    def clear_cooldown(self):
+        super().clear_cooldown()
+        log.info("Cooldown reset")
+
+    def log_status(self):
+        now = self.now()
+        cooldown = max(0, int(self.cooldown_until - now)) if self.cooldown_active() else 0
+        quota = self.quotas.remaining(now) if self.quotas else None
+        log.info(
+            "Profile %s, cooldown %ds, allowance %s, quota %s",
+            self.profile.name,
+            cooldown,
+            "unlimited" if self.allowance_remaining is None else f"{int(self.allowance_remaining)}s",
+            "unlimited" if quota is None else f"{int(quota)}s",
+        )
+        for game in self.game_states:
+            if game.running:
+                log.info("%s running (pid %s), %ds left", game.config.name, game.pid, int(game.end_ts - now))
+                resources = game.resources.summary()
+                if resources is not None:
+                    log.info("%s resources: %s", game.config.name, resources.describe())
+                recent = game.resources.recent_summary()
+                if recent is not None:
+                    log.info(
+                        "%s last %d samples: %s", game.config.name, recent.samples, recent.describe()
+                    )
+        if self.scanner is not None:
+            log.info(
+                "Scan budget %.1fms, coverage %.0f%%, pass %.1fs, detection delay <= %.1fs",
+                self.scanner.budget_seconds * 1000,
+                self.scanner.coverage * 100,
+                self.scanner.pass_seconds or 0.0,
+                self.scanner.detection_delay,
+            )
+
+    def install_signal_handlers(self):
+        def stop(_signum, _frame):
+            self.stopping = True
+
+        def request(attr):
+            def handler(_signum, _frame):
+                setattr(self, attr, True)
+
+            return handler
+
+        handlers = {
+            "SIGTERM": stop,
+            "SIGINT": stop,
+            "SIGHUP": request("reload_requested"),
+            "SIGUSR1": request("reset_requested"),
+            "SIGUSR2": request("status_requested"),
+        }
+        for name, handler in handlers.items():
+            signum = getattr(signal, name, None)
+            if signum is not None:
+                signal.signal(signum, handler)
+
+    def run(self, once=False):
+        self.install_signal_handlers()
+        log.info(
+            "Headless enforcement started (pid %d, backend %s, profile %s, settings watch %s)",
+            self.own_pid,
+            self.process_backend.name,
+            self.profile.name,
+            self.settings_watcher.mode,
+        )
+        try:
+            while not self.stopping:
+                if self.settings_watcher.poll():
+                    self.reload_requested = True
+                if self.reload_requested:
+                    self.reload_requested = False
+                    self.reload()
+                if self.reset_requested:
+                    self.reset_requested = False
+                    self.clear_cooldown()
+                if self.status_requested:
+                    self.status_requested = False
+                    self.log_status()
+                self.tick()
+                if once:
+                    break
+                wait = self.options["tick_seconds"]
+                next_deadline = self.deadlines.next_deadline()
+                if next_deadline is not None:
+                    wait = min(wait, max(0.0, next_deadline - self.now()))
+                time.sleep(wait)
+        finally:
+            self.close()
+        return 0
+
+    def close(self):
+        self.save_session_snapshot()
+        self.process_backend.close()
+        self.settings_watcher.close()
+        self.profile_store.close()
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="PC Timer headless enforcement daemon. SIGHUP reloads the config, "
+        "SIGUSR1 resets the cooldown, SIGUSR2 logs the current status."
+    )
+    parser.add_argument("--headless", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument(
+        "--config",
+        metavar="PATH",
+        help="JSON config file (default: headless.json next to settings.json)",
+    )
+    parser.add_argument("--once", action="store_true", help="run a single tick and exit")
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        metavar="PORT",
+        help="serve OpenMetrics on http://127.0.0.1:PORT/metrics",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        metavar="PATH",
+        help="write OpenMetrics text to PATH every few seconds",
+    )
+    parser.add_argument("--verbose", action="store_true", help="log debug messages")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s %(levelname)s %(message)s",
+    )
+    if psutil is None:
+        log.error("psutil is required for headless enforcement")
+        return 2
+    timer = HeadlessTimer(args.config)
+    exporters = start_exporters(timer.metrics, args.metrics_port, args.metrics_file)
+    try:
+        return timer.run(once=args.once)
+    finally:
+        for exporter in exporters:
+            exporter.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
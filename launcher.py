@@ -0,0 +1,163 @@
+import os
+import queue
+import subprocess
+import threading
+import time
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from exe_index import ExecutableIndex
+from process_backend import create_process_backend
+
+
+LAUNCH_READY = "ready"
+LAUNCH_FAILED = "failed"
+LAUNCH_TIMEOUT = "timeout"
+
+LAUNCH_TIMEOUT_SECONDS = 30.0
+BACKOFF_INITIAL_SECONDS = 0.05
+BACKOFF_MAX_SECONDS = 1.0
+DIRECT_READY_SECONDS = 0.25
+
+
+class LaunchResult:
+    __slots__ = ("target", "status", "popen", "pid", "create_time", "latency", "error")
+
+    def __init__(
+        self,
+        target,
+        status,
+        popen=None,
+        pid=None,
+        create_time=None,
+        latency=None,
+        error=None,
+    ):
+        self.target = target
+        self.status = status
+        self.popen = popen
+        self.pid = pid
+        self.create_time = create_time
+        self.latency = latency
+        self.error = error
+
+
+class LaunchPipeline:
+    def __init__(self, timeout=LAUNCH_TIMEOUT_SECONDS):
+        self.timeout = timeout
+        self.results = queue.Queue()
+        self.pending = 0
+
+    def launch(self, target, name, argv, paths, identifiers, helper=False):
+        self.pending += 1
+        thread = threading.Thread(
+            target=self._run,
+            args=(target, name, argv, list(paths), [i.lower() for i in identifiers], helper),
+            name=f"launch-{name}",
+            daemon=True,
+        )
+        thread.start()
+
+    def poll(self):
+        results = []
+        while True:
+            try:
+                results.append(self.results.get_nowait())
+            except queue.Empty:
+                break
+        self.pending -= len(results)
+        return results
+
+    def _run(self, target, name, argv, paths, identifiers, helper):
+        started = time.monotonic()
+        try:
+            popen = subprocess.Popen(argv)
+        except Exception as exc:
+            self.results.put(LaunchResult(target, LAUNCH_FAILED, error=str(exc)))
+            return
+
+        backend = create_process_backend(use_proc_connector=False)
+        index = ExecutableIndex()
+        index.rebuild({name: paths})
+        try:
+            status, pid = self._wait_ready(
+                popen, backend, index, name, identifiers, helper, started
+            )
+        except Exception as exc:
+            status, pid = LAUNCH_FAILED, None
+            error = str(exc)
+            if popen.poll() is None:
+                popen.terminate()
+        else:
+            error = None
+            if status == LAUNCH_FAILED and popen.returncode is not None:
+                error = f"exited with code {popen.returncode}"
+        finally:
+            backend.close()
+
+        create_time = None
+        if pid is not None and psutil is not None:
+            try:
+                create_time = psutil.Process(pid).create_time()
+            except psutil.Error:
+                create_time = None
+        self.results.put(
+            LaunchResult(
+                target,
+                status,
+                popen=popen,
+                pid=pid,
+                create_time=create_time,
+                latency=time.monotonic() - started,
+                error=error,
+            )
+        )
+
+    def _wait_ready(self, popen, backend, index, name, identifiers, helper, started):
+        excluded = {os.getpid(), popen.pid}
+        delay = BACKOFF_INITIAL_SECONDS
+        deadline = started + self.timeout
+        while True:
+            exit_code = popen.poll()
+            now = time.monotonic()
+            if exit_code is None and not helper:
+                # A direct child is the indexed executable itself, so it is
+                # the process to track and kill even if it is a launcher that
+                # starts the game later. It counts as ready once it has stayed
+                # up for DIRECT_READY_SECONDS, so a binary that fails on start
+                # is reported as a failed launch instead of a session.
+                # Readiness does not mean the game has finished loading.
+                if now - started >= DIRECT_READY_SECONDS:
+                    return LAUNCH_READY, popen.pid
+            else:
+                # A helper such as `open -a`, or a child that exits with 0
+                # straight away, only hands off; probe for the real process.
+                pid = self._find_process(backend, index, name, identifiers, excluded)
+                if pid is not None:
+                    return LAUNCH_READY, pid
+                if exit_code is not None and exit_code != 0:
+                    return LAUNCH_FAILED, None
+            if now >= deadline:
+                # A helper still running at the deadline has not handed off
+                # to anything we can track, so it is not a session.
+                if exit_code is None and not helper:
+                    return LAUNCH_READY, popen.pid
+                return LAUNCH_TIMEOUT, None
+            time.sleep(min(delay, deadline - now))
+            delay = min(delay * 2, BACKOFF_MAX_SECONDS)
+
+    def _find_process(self, backend, index, name, identifiers, excluded):
+        # The indexed executable wins; an exact identifier name is the fallback,
+        # e.g. a launcher that starts the game under another runtime.
+        fallback = None
+        for info in backend.iter_processes():
+            if info.pid in excluded:
+                continue
+            if index.lookup(info.exe) == name:
+                return info.pid
+            if fallback is None and info.is_named(identifiers):
+                fallback = info.pid
+        return fallback
@@ -0,0 +1,378 @@
+import glob
+import json
+import os
+import re
+import stat
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import windows_xbox_roots
+from exe_index import normalize_path
+
+INDEX_VERSION = 1
+MAX_DEPTH = 5
+MAX_WORKERS = 8
+SEARCH_LIMIT = 200
+
+SOURCE_STEAM = "Steam"
+SOURCE_EPIC = "Epic"
+SOURCE_XBOX = "Xbox"
+SOURCE_CUSTOM = "Custom"
+
+IGNORED_EXE_WORDS = ("unins", "crash", "redist", "setup", "install", "update", "dxweb", "vc_")
+NATIVE_LIBRARY_SUFFIXES = (".dll", ".dylib", ".so")
+VDF_TOKEN = re.compile(r'"((?:[^"\\]|\\.)*)"|([{}])')
+
+
+def parse_vdf(text):
+    # Valve KeyValues as used by libraryfolders.vdf and appmanifest_*.acf.
+    # Keys are lowercased because Steam has changed their case over time.
+    root = {}
+    stack = [root]
+    key = None
+    for match in VDF_TOKEN.finditer(text):
+        string, brace = match.groups()
+        if brace == "{":
+            child = {}
+            if key is not None:
+                stack[-1][key] = child
+            stack.append(child)
+            key = None
+        elif brace == "}":
+            if len(stack) > 1:
+                stack.pop()
+            key = None
+        elif key is None:
+            key = string.replace("\\\\", "\\").lower()
+        else:
+            stack[-1][key] = string.replace("\\\\", "\\")
+            key = None
+    return root
+
+
+def read_text(path):
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+class LibraryRoot:
+    __slots__ = ("source", "title", "path")
+
+    def __init__(self, source, title, path):
+        self.source = source
+        self.title = title
+        self.path = path
+
+
+class LibraryEntry:
+    __slots__ = ("title", "source", "path", "mtime", "key")
+
+    def __init__(self, title, source, path, mtime):
+        self.title = title
+        self.source = source
+        self.path = path
+        self.mtime = mtime
+        self.key = f"{title} {os.path.basename(path)}".lower()
+
+
+def steam_dirs():
+    if sys.platform.startswith("win"):
+        bases = [os.environ.get("ProgramFiles(x86)"), os.environ.get("ProgramFiles")]
+        return [os.path.join(base, "Steam") for base in bases if base]
+    home = os.path.expanduser("~")
+    if sys.platform == "darwin":
+        return [os.path.join(home, "Library", "Application Support", "Steam")]
+    return [
+        os.path.join(home, ".steam", "steam"),
+        os.path.join(home, ".local", "share", "Steam"),
+        os.path.join(home, ".var", "app", "com.valvesoftware.Steam", ".local", "share", "Steam"),
+    ]
+
+
+def steam_libraries():
+    libraries = []
+    for steam_dir in steam_dirs():
+        if not os.path.isdir(steam_dir):
+            continue
+        libraries.append(steam_dir)
+        text = read_text(os.path.join(steam_dir, "steamapps", "libraryfolders.vdf"))
+        if text is None:
+            continue
+        folders = parse_vdf(text).get("libraryfolders", {})
+        for value in folders.values():
+            # Newer files nest {"path": ...}; older ones map an index to the path.
+            path = value.get("path") if isinstance(value, dict) else value
+            if isinstance(path, str) and os.path.isdir(path):
+                libraries.append(path)
+    return libraries
+
+
+def steam_roots():
+    roots = []
+    for library in steam_libraries():
+        steamapps = os.path.join(library, "steamapps")
+        common = os.path.join(steamapps, "common")
+        titled = set()
+        for manifest in glob.glob(os.path.join(steamapps, "appmanifest_*.acf")):
+            text = read_text(manifest)
+            if text is None:
+                continue
+            app = parse_vdf(text).get("appstate", {})
+            installdir = app.get("installdir")
+            if not isinstance(installdir, str) or not installdir:
+                continue
+            titled.add(installdir)
+            roots.append(
+                LibraryRoot(SOURCE_STEAM, app.get("name") or installdir, os.path.join(common, installdir))
+            )
+        roots.extend(child_roots(SOURCE_STEAM, common, skip=titled))
+    return roots
+
+
+def epic_manifest_dir():
+    if sys.platform.startswith("win"):
+        base = os.environ.get("ProgramData") or r"C:\ProgramData"
+        return os.path.join(base, "Epic", "EpicGamesLauncher", "Data", "Manifests")
+    if sys.platform == "darwin":
+        return os.path.join(
+            os.path.expanduser("~"),
+            "Library",
+            "Application Support",
+            "Epic",
+            "EpicGamesLauncher",
+            "Data",
+            "Manifests",
+        )
+    return None
+
+
+def epic_roots():
+    manifest_dir = epic_manifest_dir()
+    if manifest_dir is None:
+        return []
+    roots = []
+    for manifest in glob.glob(os.path.join(manifest_dir, "*.item")):
+        text = read_text(manifest)
+        if text is None:
+            continue
+        try:
+            item = json.loads(text)
+        except json.JSONDecodeError:
+            continue
+        if not isinstance(item, dict):
+            continue
+        location = item.get("InstallLocation")
+        if isinstance(location, str) and location:
+            title = item.get("DisplayName") or os.path.basename(location)
+            roots.append(LibraryRoot(SOURCE_EPIC, title, location))
+    return roots
+
+
+def xbox_roots():
+    if not sys.platform.startswith("win"):
+        return []
+    roots = []
+    for xbox_root in windows_xbox_roots():
+        roots.extend(child_roots(SOURCE_XBOX, xbox_root))
+    return roots
+
+
+def child_roots(source, parent, skip=()):
+    try:
+        with os.scandir(parent) as entries:
+            return [
+                LibraryRoot(source, entry.name, entry.path)
+                for entry in entries
+                if entry.is_dir() and entry.name not in skip and not entry.name.startswith(".")
+            ]
+    except OSError:
+        return []
+
+
+def discover_roots(extra_dirs=()):
+    roots = steam_roots() + epic_roots() + xbox_roots()
+    for directory in extra_dirs:
+        roots.extend(child_roots(SOURCE_CUSTOM, directory))
+    unique = []
+    seen = set()
+    for root in roots:
+        normalized = normalize_path(root.path)
+        if normalized not in seen:
+            seen.add(normalized)
+            unique.append(root)
+    return unique
+
+
+def is_executable(name, st):
+    lowered = name.lower()
+    if any(word in lowered for word in IGNORED_EXE_WORDS):
+        return False
+    if lowered.endswith(".exe"):
+        return True
+    if sys.platform.startswith("win") or not stat.S_ISREG(st.st_mode):
+        return False
+    if not st.st_mode & 0o111:
+        return False
+    return not any(suffix in lowered for suffix in NATIVE_LIBRARY_SUFFIXES)
+
+
+def bundle_executable(bundle_path):
+    macos_dir = os.path.join(bundle_path, "Contents", "MacOS")
+    stem = os.path.splitext(os.path.basename(bundle_path))[0]
+    if os.path.isfile(os.path.join(macos_dir, stem)):
+        return os.path.join("Contents", "MacOS", stem)
+    try:
+        names = sorted(os.listdir(macos_dir))
+    except OSError:
+        return None
+    return os.path.join("Contents", "MacOS", names[0]) if names else None
+
+
+def read_dir(path, mtime):
+    subdirs = []
+    exes = {}
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                if stat.S_ISDIR(st.st_mode):
+                    if entry.name.endswith(".app"):
+                        relative = bundle_executable(entry.path)
+                        if relative is not None:
+                            exes[os.path.join(entry.name, relative)] = st.st_mtime_ns
+                    else:
+                        subdirs.append(entry.name)
+                elif is_executable(entry.name, st):
+                    exes[entry.name] = st.st_mtime_ns
+    except OSError:
+        pass
+    return [mtime, subdirs, exes]
+
+
+def scan_tree(root, cached, max_depth=MAX_DEPTH):
+    # Every directory is stat()ed, but only those whose mtime changed since
+    # the last scan are listed again. Adding or removing a file updates the
+    # mtime of the directory that contains it.
+    fresh = {}
+    listed = 0
+    stack = [(root, 0)]
+    while stack:
+        path, depth = stack.pop()
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            continue
+        entry = cached.get(path)
+        if entry is None or entry[0] != mtime:
+            entry = read_dir(path, mtime)
+            listed += 1
+        fresh[path] = entry
+        if depth < max_depth:
+            stack.extend((os.path.join(path, name), depth + 1) for name in entry[1])
+    return fresh, listed
+
+
+class LibraryIndex:
+    def __init__(self, path):
+        self.path = path
+        self.dirs = {}
+        self.entries = []
+        self.visited = 0
+        self.listed = 0
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+            return
+        self.dirs = data.get("dirs", {})
+        self.entries = [LibraryEntry(*row) for row in data.get("entries", [])]
+
+    def save(self):
+        payload = {
+            "version": INDEX_VERSION,
+            "dirs": self.dirs,
+            "entries": [[e.title, e.source, e.path, e.mtime] for e in self.entries],
+        }
+        temp_path = f"{self.path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=True)
+            os.replace(temp_path, self.path)
+        except OSError:
+            return
+
+    def rescan(self, roots, workers=MAX_WORKERS):
+        with self.lock:
+            cached = self.dirs
+            dirs = {}
+            entries = []
+            seen = set()
+            listed = 0
+            if roots:
+                with ThreadPoolExecutor(max_workers=min(workers, len(roots))) as pool:
+                    results = pool.map(lambda root: scan_tree(root.path, cached), roots)
+                    for root, (fresh, root_listed) in zip(roots, results):
+                        dirs.update(fresh)
+                        listed += root_listed
+                        for directory, (_mtime, _subdirs, exes) in fresh.items():
+                            for name, exe_mtime in exes.items():
+                                path = os.path.join(directory, name)
+                                normalized = normalize_path(path)
+                                if normalized in seen:
+                                    continue
+                                seen.add(normalized)
+                                entries.append(LibraryEntry(root.title, root.source, path, exe_mtime))
+            entries.sort(key=lambda e: (e.title.lower(), e.path.lower()))
+            self.dirs = dirs
+            self.entries = entries
+            self.visited = len(dirs)
+            self.listed = listed
+            self.save()
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        words = query.lower().split()
+        results = []
+        for entry in self.entries:
+            if all(word in entry.key for word in words):
+                results.append(entry)
+                if len(results) >= limit:
+                    break
+        return results
+
+
+class LibraryScan:
+    def __init__(self, index, extra_dirs=()):
+        self.index = index
+        self.extra_dirs = list(extra_dirs)
+        self.finished = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="library-scan", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _run(self):
+        try:
+            self.index.rescan(discover_roots(self.extra_dirs))
+        finally:
+            self.finished.set()
+
+    @property
+    def done(self):
+        return self.finished.is_set()
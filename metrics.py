@@ -0,0 +1,286 @@
+import bisect
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+FILE_EXPORT_INTERVAL_SECONDS = 10.0
+
+SCAN_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+KILL_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 2.5, 5.0)
+LAUNCH_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Metrics are only updated from the thread that runs tick(). Updates are plain
+# attribute and list-slot writes, and exporter threads read them without
+# locking. A scrape may therefore see a histogram whose _count is one
+# observation ahead of its buckets, which is acceptable for monitoring.
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_value(value):
+    if isinstance(value, float):
+        if value == float("inf"):
+            return "+Inf"
+        return repr(value)
+    return str(value)
+
+
+class Counter:
+    __slots__ = ("name", "help", "label", "value", "values")
+
+    def __init__(self, name, help_text, label=None):
+        self.name = name
+        self.help = help_text
+        self.label = label
+        self.value = 0
+        self.values = {}
+
+    def inc(self, amount=1, label_value=None):
+        if self.label is None:
+            self.value += amount
+        else:
+            self.values[label_value] = self.values.get(label_value, 0) + amount
+
+    def render(self, out):
+        out.append(f"# TYPE {self.name} counter")
+        out.append(f"# HELP {self.name} {self.help}")
+        if self.label is None:
+            out.append(f"{self.name}_total {format_value(self.value)}")
+            return
+        for label_value, value in list(self.values.items()):
+            out.append(
+                f'{self.name}_total{{{self.label}="{escape_label(label_value)}"}} {format_value(value)}'
+            )
+
+
+class Gauge:
+    __slots__ = ("name", "help", "value")
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.value = 0
+
+    def set(self, value):
+        self.value = value
+
+    def render(self, out):
+        out.append(f"# TYPE {self.name} gauge")
+        out.append(f"# HELP {self.name} {self.help}")
+        out.append(f"{self.name} {format_value(self.value)}")
+
+
+class Histogram:
+    __slots__ = ("name", "help", "bounds", "counts", "sum", "count")
+
+    def __init__(self, name, help_text, bounds):
+        self.name = name
+        self.help = help_text
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, out):
+        out.append(f"# TYPE {self.name} histogram")
+        out.append(f"# HELP {self.name} {self.help}")
+        counts = list(self.counts)
+        cumulative = 0
+        for bound, count in zip(self.bounds + (float("inf"),), counts):
+            cumulative += count
+            out.append(f'{self.name}_bucket{{le="{format_value(float(bound))}"}} {cumulative}')
+        out.append(f"{self.name}_sum {format_value(self.sum)}")
+        out.append(f"{self.name}_count {cumulative}")
+
+
+class EnforcementMetrics:
+    def __init__(self):
+        self.ticks = Counter("pctimer_ticks", "Enforcement ticks run.")
+        self.processes_scanned = Counter(
+            "pctimer_processes_scanned", "Process table entries inspected."
+        )
+        self.processes_scanned_last_tick = Gauge(
+            "pctimer_processes_scanned_last_tick",
+            "Process table entries inspected during the most recent tick.",
+        )
+        self.scan_seconds = Histogram(
+            "pctimer_scan_seconds", "Duration of one process table scan.", SCAN_BUCKETS
+        )
+        self.kill_seconds = Histogram(
+            "pctimer_kill_seconds", "Duration of killing a game's processes.", KILL_BUCKETS
+        )
+        self.kills = Counter(
+            "pctimer_kill_processes",
+            "Game processes stopped, by whether terminate sufficed or kill was needed.",
+            label="outcome",
+        )
+        self.launch_seconds = Histogram(
+            "pctimer_launch_seconds",
+            "Time from starting a game until its process was found.",
+            LAUNCH_BUCKETS,
+        )
+        self.launches = Counter(
+            "pctimer_launches", "Game launches, by outcome.", label="outcome"
+        )
+        self.sessions_started = Counter(
+            "pctimer_sessions_started", "Sessions started, by game.", label="game"
+        )
+        self.sessions_ended = Counter(
+            "pctimer_sessions_ended", "Sessions ended, by reason.", label="reason"
+        )
+        self.cooldown_active = Gauge(
+            "pctimer_cooldown_active", "1 while a cooldown blocks new sessions."
+        )
+        self.cooldown_remaining_seconds = Gauge(
+            "pctimer_cooldown_remaining_seconds", "Seconds until the cooldown ends."
+        )
+        self.lockdown_restores = Counter(
+            "pctimer_lockdown_restores",
+            "Times the lock was found escaped and restored, by what triggered the check.",
+            label="trigger",
+        )
+        self.scan_budget_seconds = Gauge(
+            "pctimer_scan_budget_seconds", "Per-tick time budget for budgeted process scanning."
+        )
+        self.scan_coverage = Gauge(
+            "pctimer_scan_coverage",
+            "Fraction of the process table re-read during the most recent tick.",
+        )
+        self.scan_pass_seconds = Gauge(
+            "pctimer_scan_pass_seconds", "Duration of the last full round-robin scan pass."
+        )
+        self.scan_detection_delay_seconds = Gauge(
+            "pctimer_scan_detection_delay_seconds",
+            "Worst-case delay before a process is matched by identifier.",
+        )
+        self.metrics = (
+            self.ticks,
+            self.processes_scanned,
+            self.processes_scanned_last_tick,
+            self.scan_seconds,
+            self.kill_seconds,
+            self.kills,
+            self.launch_seconds,
+            self.launches,
+            self.sessions_started,
+            self.sessions_ended,
+            self.cooldown_active,
+            self.cooldown_remaining_seconds,
+            self.lockdown_restores,
+            self.scan_budget_seconds,
+            self.scan_coverage,
+            self.scan_pass_seconds,
+            self.scan_detection_delay_seconds,
+        )
+        self.tick_scanned = 0
+
+    def begin_tick(self):
+        self.tick_scanned = 0
+
+    def record_scan(self, scanned, seconds):
+        self.tick_scanned += scanned
+        self.processes_scanned.inc(scanned)
+        self.scan_seconds.observe(seconds)
+
+    def record_scanner(self, scanner):
+        self.record_scan(scanner.last_reads, scanner.last_seconds)
+        self.scan_budget_seconds.set(scanner.budget_seconds)
+        self.scan_coverage.set(scanner.coverage)
+        self.scan_pass_seconds.set(scanner.pass_seconds or 0.0)
+        self.scan_detection_delay_seconds.set(scanner.detection_delay)
+
+    def end_tick(self, cooldown_remaining):
+        self.ticks.inc()
+        self.processes_scanned_last_tick.set(self.tick_scanned)
+        self.cooldown_active.set(1 if cooldown_remaining > 0 else 0)
+        self.cooldown_remaining_seconds.set(cooldown_remaining)
+
+    def render(self):
+        out = []
+        for metric in self.metrics:
+            metric.render(out)
+        out.append("# EOF")
+        return "\n".join(out) + "\n"
+
+
+class MetricsHTTPServer:
+    def __init__(self, metrics, port, host="127.0.0.1"):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                return
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, name="metrics-http", daemon=True
+        )
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class MetricsFileWriter:
+    def __init__(self, metrics, path, interval=FILE_EXPORT_INTERVAL_SECONDS):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="metrics-file", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def write(self):
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write(self.metrics.render())
+            os.replace(temp_path, self.path)
+        except OSError:
+            return
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            self.write()
+
+    def close(self):
+        self.stopped.set()
+        self.write()
+
+
+def start_exporters(metrics, port=None, path=None):
+    exporters = []
+    if port is not None:
+        exporters.append(MetricsHTTPServer(metrics, port).start())
+    if path:
+        exporters.append(MetricsFileWriter(metrics, path).start())
+    return exporters
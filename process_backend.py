@@ -0,0 +1,292 @@
+import errno
+import os
+import socket
+import struct
+import sys
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+NETLINK_CONNECTOR = 11
+CN_IDX_PROC = 1
+CN_VAL_PROC = 1
+NLMSG_DONE = 3
+PROC_CN_MCAST_LISTEN = 1
+PROC_CN_MCAST_IGNORE = 2
+
+PROC_EVENT_FORK = 0x00000001
+PROC_EVENT_EXEC = 0x00000002
+PROC_EVENT_EXIT = 0x80000000
+
+# struct nlmsghdr, struct cn_msg, struct proc_event header (what, cpu, timestamp_ns)
+NLMSGHDR = struct.Struct("=IHHII")
+CN_MSG = struct.Struct("=IIIIHH")
+PROC_EVENT_HEADER = struct.Struct("=IIQ")
+PROC_EVENT_PAIR = struct.Struct("=II")
+PROC_EVENT_QUAD = struct.Struct("=IIII")
+EVENT_OFFSET = NLMSGHDR.size + CN_MSG.size
+
+READ_BUFFER_SIZE = 64 * 1024
+RECV_BUFFER_SIZE = 8 * 1024
+
+
+class ProcessInfo:
+    __slots__ = ("pid", "name", "exe", "cmdline", "ppid", "haystack")
+
+    def __init__(self, pid, name, exe, cmdline, ppid=0):
+        self.pid = pid
+        self.name = name or ""
+        self.exe = exe or ""
+        self.cmdline = cmdline or []
+        self.ppid = ppid or 0
+        self.haystack = f"{self.name} {self.exe} {' '.join(self.cmdline)}".lower()
+
+    def matches(self, identifiers):
+        return any(token in self.haystack for token in identifiers)
+
+    def is_named(self, identifiers):
+        # Exact process or executable name, without a Windows ".exe" suffix.
+        names = {self.name.lower(), os.path.basename(self.exe).lower()}
+        names.update([name[:-4] for name in names if name.endswith(".exe")])
+        return any(token in names for token in identifiers)
+
+
+class PsutilProcessBackend:
+    name = "psutil"
+
+    def iter_processes(self):
+        if psutil is None:
+            return
+        for proc in psutil.process_iter(["name", "exe", "cmdline", "ppid"]):
+            try:
+                info = proc.info
+                yield ProcessInfo(
+                    proc.pid,
+                    info.get("name"),
+                    info.get("exe"),
+                    info.get("cmdline"),
+                    info.get("ppid"),
+                )
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+
+    def list_pids(self):
+        if psutil is None:
+            return []
+        return psutil.pids()
+
+    def read_process(self, pid):
+        try:
+            proc = psutil.Process(pid)
+            with proc.oneshot():
+                name = proc.name()
+                ppid = proc.ppid()
+                try:
+                    exe = proc.exe()
+                except psutil.AccessDenied:
+                    exe = ""
+                try:
+                    cmdline = proc.cmdline()
+                except psutil.AccessDenied:
+                    cmdline = []
+        except psutil.Error:
+            return None
+        return ProcessInfo(pid, name, exe, cmdline, ppid)
+
+    def close(self):
+        pass
+
+
+class ProcConnector:
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_CONNECTOR)
+        try:
+            self.sock.bind((0, CN_IDX_PROC))
+            self._send_op(PROC_CN_MCAST_LISTEN)
+            self.sock.setblocking(False)
+        except OSError:
+            self.sock.close()
+            raise
+        self._buf = bytearray(RECV_BUFFER_SIZE)
+        self._view = memoryview(self._buf)
+
+    def _send_op(self, op):
+        payload = struct.pack("=I", op)
+        cn_msg = CN_MSG.pack(CN_IDX_PROC, CN_VAL_PROC, 0, 0, len(payload), 0)
+        total = NLMSGHDR.size + len(cn_msg) + len(payload)
+        header = NLMSGHDR.pack(total, NLMSG_DONE, 0, 0, 0)
+        self.sock.send(header + cn_msg + payload)
+
+    def drain(self):
+        # Returns (events, overflowed); each event is (kind, pid, parent_pid).
+        events = []
+        while True:
+            try:
+                size = self.sock.recv_into(self._buf)
+            except BlockingIOError:
+                return events, False
+            except OSError as exc:
+                if exc.errno == errno.ENOBUFS:
+                    return events, True
+                raise
+            offset = 0
+            while offset + EVENT_OFFSET + PROC_EVENT_HEADER.size <= size:
+                msg_len = NLMSGHDR.unpack_from(self._view, offset)[0]
+                if msg_len < NLMSGHDR.size:
+                    break
+                self._parse_event(offset + EVENT_OFFSET, events)
+                offset += (msg_len + 3) & ~3
+
+    def _parse_event(self, offset, events):
+        what = PROC_EVENT_HEADER.unpack_from(self._view, offset)[0]
+        data = offset + PROC_EVENT_HEADER.size
+        if what == PROC_EVENT_FORK:
+            parent_pid, parent_tgid, child_pid, child_tgid = PROC_EVENT_QUAD.unpack_from(
+                self._view, data
+            )
+            if child_pid == child_tgid:
+                events.append((PROC_EVENT_FORK, child_tgid, parent_tgid))
+        elif what == PROC_EVENT_EXEC:
+            pid, tgid = PROC_EVENT_PAIR.unpack_from(self._view, data)
+            events.append((PROC_EVENT_EXEC, tgid, None))
+        elif what == PROC_EVENT_EXIT:
+            pid, tgid = PROC_EVENT_PAIR.unpack_from(self._view, data)
+            if pid == tgid:
+                events.append((PROC_EVENT_EXIT, tgid, None))
+
+    def close(self):
+        try:
+            self._send_op(PROC_CN_MCAST_IGNORE)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class LinuxProcBackend:
+    name = "linux-proc"
+
+    def __init__(self, proc_root="/proc", use_proc_connector=True):
+        self.proc_root = proc_root
+        self._buf = bytearray(READ_BUFFER_SIZE)
+        self._view = memoryview(self._buf)
+        self.table = None
+        self.connector = None
+        if use_proc_connector:
+            try:
+                self.connector = ProcConnector()
+            except (OSError, AttributeError):
+                self.connector = None
+
+    def _read_file(self, path):
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            size = os.readv(fd, [self._buf])
+            if size < len(self._buf):
+                return bytes(self._view[:size])
+            chunks = [bytes(self._buf)]
+            while True:
+                chunk = os.read(fd, READ_BUFFER_SIZE)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            return b"".join(chunks)
+        finally:
+            os.close(fd)
+
+    def read_process(self, pid):
+        base = f"{self.proc_root}/{pid}"
+        try:
+            stat = self._read_file(f"{base}/stat")
+            raw_cmdline = self._read_file(f"{base}/cmdline")
+        except OSError:
+            return None
+        end = stat.rfind(b")")
+        name = stat[stat.find(b"(") + 1 : end].decode("utf-8", "replace")
+        # The fields after the name start with the state and the parent pid.
+        try:
+            ppid = int(stat[end + 2 :].split(None, 2)[1])
+        except (IndexError, ValueError):
+            ppid = 0
+        cmdline = [
+            part.decode("utf-8", "replace") for part in raw_cmdline.split(b"\0") if part
+        ]
+        try:
+            exe = os.readlink(f"{base}/exe")
+        except OSError:
+            exe = ""
+        return ProcessInfo(pid, name, exe, cmdline, ppid)
+
+    def list_pids(self):
+        try:
+            entries = os.scandir(self.proc_root)
+        except OSError:
+            return []
+        with entries:
+            return [int(entry.name) for entry in entries if entry.name.isdigit()]
+
+    def scan(self):
+        table = {}
+        try:
+            entries = os.scandir(self.proc_root)
+        except OSError:
+            return table
+        with entries:
+            for entry in entries:
+                if not entry.name.isdigit():
+                    continue
+                info = self.read_process(int(entry.name))
+                if info is not None:
+                    table[info.pid] = info
+        return table
+
+    def _apply_events(self):
+        events, overflowed = self.connector.drain()
+        if overflowed:
+            self.table = None
+            return
+        for kind, pid, parent_pid in events:
+            if kind == PROC_EVENT_EXIT:
+                self.table.pop(pid, None)
+                continue
+            parent = self.table.get(parent_pid) if kind == PROC_EVENT_FORK else None
+            if parent is not None:
+                self.table[pid] = ProcessInfo(
+                    pid, parent.name, parent.exe, parent.cmdline, parent_pid
+                )
+                continue
+            info = self.read_process(pid)
+            if info is not None:
+                self.table[pid] = info
+            else:
+                self.table.pop(pid, None)
+
+    def iter_processes(self):
+        if self.connector is None:
+            return iter(self.scan().values())
+        if self.table is not None:
+            try:
+                self._apply_events()
+            except OSError:
+                self.connector.close()
+                self.connector = None
+                self.table = None
+                return iter(self.scan().values())
+        if self.table is None:
+            self.connector.drain()
+            self.table = self.scan()
+        return iter(list(self.table.values()))
+
+    def close(self):
+        if self.connector is not None:
+            self.connector.close()
+            self.connector = None
+        self.table = None
+
+
+def create_process_backend(use_proc_connector=True):
+    if sys.platform.startswith("linux") and os.path.isdir("/proc/self"):
+        return LinuxProcBackend(use_proc_connector=use_proc_connector)
+    return PsutilProcessBackend()
@@ -0,0 +1,180 @@
+import sqlite3
+import time
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    daily_allowance_minutes REAL,
+    cooldown_until REAL
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    profile_id INTEGER NOT NULL REFERENCES profiles(id),
+    day TEXT NOT NULL,
+    start_ts REAL NOT NULL,
+    duration REAL NOT NULL,
+    game TEXT NOT NULL,
+    reason TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_profile_day
+    ON sessions (profile_id, day, duration);
+CREATE INDEX IF NOT EXISTS sessions_profile_start
+    ON sessions (profile_id, start_ts);
+CREATE TABLE IF NOT EXISTS session_resources (
+    session_id INTEGER PRIMARY KEY REFERENCES sessions(id),
+    samples INTEGER NOT NULL,
+    cpu_avg REAL NOT NULL,
+    cpu_peak REAL NOT NULL,
+    rss_avg REAL NOT NULL,
+    rss_peak REAL NOT NULL,
+    procs_peak INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+DEFAULT_PROFILE_NAME = "Default"
+
+
+def day_key(ts):
+    return time.strftime("%Y-%m-%d", time.localtime(ts))
+
+
+class Profile:
+    __slots__ = ("id", "name", "daily_allowance_minutes", "cooldown_until")
+
+    def __init__(self, profile_id, name, daily_allowance_minutes=None, cooldown_until=None):
+        self.id = profile_id
+        self.name = name
+        self.daily_allowance_minutes = daily_allowance_minutes
+        self.cooldown_until = cooldown_until
+
+
+class ProfileStore:
+    def __init__(self, path):
+        try:
+            self.conn = sqlite3.connect(path)
+            self.conn.executescript(SCHEMA)
+        except sqlite3.Error:
+            self.conn = sqlite3.connect(":memory:")
+            self.conn.executescript(SCHEMA)
+        self.profiles = {}
+        for row in self.conn.execute(
+            "SELECT id, name, daily_allowance_minutes, cooldown_until FROM profiles ORDER BY id"
+        ):
+            self.profiles[row[0]] = Profile(*row)
+        if not self.profiles:
+            self.create_profile(DEFAULT_PROFILE_NAME)
+
+    def list_profiles(self):
+        return list(self.profiles.values())
+
+    def find_profile(self, name):
+        for profile in self.profiles.values():
+            if profile.name == name:
+                return profile
+        return None
+
+    def create_profile(self, name, daily_allowance_minutes=None):
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO profiles (name, daily_allowance_minutes) VALUES (?, ?)",
+                (name, daily_allowance_minutes),
+            )
+        profile = Profile(cursor.lastrowid, name, daily_allowance_minutes)
+        self.profiles[profile.id] = profile
+        return profile
+
+    def set_allowance(self, profile, daily_allowance_minutes):
+        with self.conn:
+            self.conn.execute(
+                "UPDATE profiles SET daily_allowance_minutes = ? WHERE id = ?",
+                (daily_allowance_minutes, profile.id),
+            )
+        profile.daily_allowance_minutes = daily_allowance_minutes
+
+    def set_cooldown(self, profile, cooldown_until):
+        with self.conn:
+            self.conn.execute(
+                "UPDATE profiles SET cooldown_until = ? WHERE id = ?",
+                (cooldown_until, profile.id),
+            )
+        profile.cooldown_until = cooldown_until
+
+    def active_profile(self):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'active_profile'").fetchone()
+        if row is not None:
+            try:
+                profile = self.profiles.get(int(row[0]))
+            except ValueError:
+                profile = None
+            if profile is not None:
+                return profile
+        return next(iter(self.profiles.values()))
+
+    def set_active_profile(self, profile):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('active_profile', ?)",
+                (str(profile.id),),
+            )
+
+    def record_session(self, profile, start_ts, duration, game, reason, resources=None):
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO sessions (profile_id, day, start_ts, duration, game, reason)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (profile.id, day_key(start_ts), start_ts, max(0.0, duration), game, reason),
+            )
+            if resources is not None:
+                self.conn.execute(
+                    "INSERT INTO session_resources"
+                    " (session_id, samples, cpu_avg, cpu_peak, rss_avg, rss_peak, procs_peak)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        cursor.lastrowid,
+                        resources.samples,
+                        resources.cpu_avg,
+                        resources.cpu_peak,
+                        resources.rss_avg,
+                        resources.rss_peak,
+                        resources.procs_peak,
+                    ),
+                )
+
+    def used_seconds(self, profile, day):
+        row = self.conn.execute(
+            "SELECT COALESCE(SUM(duration), 0) FROM sessions WHERE profile_id = ? AND day = ?",
+            (profile.id, day),
+        ).fetchone()
+        return row[0]
+
+    def remaining_allowance(self, profile, day):
+        if profile.daily_allowance_minutes is None:
+            return None
+        used = self.used_seconds(profile, day)
+        return max(0.0, profile.daily_allowance_minutes * 60 - used)
+
+    def sessions_since(self, profile, since):
+        return self.conn.execute(
+            "SELECT start_ts, duration FROM sessions"
+            " WHERE profile_id = ? AND start_ts >= ? ORDER BY start_ts",
+            (profile.id, since),
+        ).fetchall()
+
+    def resource_usage(self):
+        # Per game across all profiles, weighting averages by sample count.
+        return self.conn.execute(
+            "SELECT s.game, COUNT(*), SUM(r.cpu_avg * r.samples) / SUM(r.samples),"
+            " MAX(r.cpu_peak), SUM(r.rss_avg * r.samples) / SUM(r.samples),"
+            " MAX(r.rss_peak), MAX(r.procs_peak)"
+            " FROM session_resources r JOIN sessions s ON s.id = r.session_id"
+            " GROUP BY s.game ORDER BY MAX(r.cpu_peak) DESC"
+        ).fetchall()
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,178 @@
+from array import array
+from datetime import datetime, timedelta
+
+BUCKET_SECONDS = 60
+MIN_PLAY_SECONDS = 1
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+
+def next_midnight(ts):
+    day = datetime.fromtimestamp(ts).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (day + timedelta(days=1)).timestamp()
+
+
+# At most `limit` seconds of play in any trailing `window` seconds. Usage lives
+# in a ring of fixed-size buckets with a running total, so moving the window
+# forward only clears the buckets that fell out of it.
+class WindowQuota:
+    __slots__ = ("limit", "window", "bucket_seconds", "buckets", "total", "head", "_next_allowed")
+
+    def __init__(self, window_seconds, limit_seconds, bucket_seconds=BUCKET_SECONDS):
+        self.limit = limit_seconds
+        self.bucket_seconds = bucket_seconds
+        count = max(1, int(round(window_seconds / bucket_seconds)))
+        self.window = count * bucket_seconds
+        self.buckets = array("d", bytes(8 * count))
+        self.total = 0.0
+        self.head = None
+        self._next_allowed = None
+
+    def _advance(self, now):
+        index = int(now // self.bucket_seconds)
+        if self.head is None:
+            self.head = index
+            return
+        steps = index - self.head
+        if steps <= 0:
+            return
+        count = len(self.buckets)
+        if steps >= count:
+            self.buckets = array("d", bytes(8 * count))
+            self.total = 0.0
+        else:
+            buckets = self.buckets
+            for offset in range(1, steps + 1):
+                slot = (self.head + offset) % count
+                self.total -= buckets[slot]
+                buckets[slot] = 0.0
+        self.head = index
+
+    def add(self, start, end):
+        if end <= start:
+            return
+        self._advance(end)
+        count = len(self.buckets)
+        size = self.bucket_seconds
+        first = max(int(start // size), self.head - count + 1)
+        for index in range(first, int(end // size) + 1):
+            seconds = min(end, (index + 1) * size) - max(start, index * size)
+            if seconds > 0:
+                self.buckets[index % count] += seconds
+                self.total += seconds
+        self._next_allowed = None
+
+    def remaining(self, now):
+        self._advance(now)
+        return max(0.0, self.limit - self.total)
+
+    def next_allowed(self, now):
+        if self.remaining(now) >= MIN_PLAY_SECONDS:
+            return now
+        if self._next_allowed is None:
+            # Usage only changes through add(), so the walk is cached until then.
+            excess = self.total - (self.limit - MIN_PLAY_SECONDS)
+            count = len(self.buckets)
+            expired = 0.0
+            for index in range(self.head - count + 1, self.head + 1):
+                expired += self.buckets[index % count]
+                if expired >= excess:
+                    self._next_allowed = (index + count) * self.bucket_seconds
+                    break
+            else:
+                self._next_allowed = (self.head + count) * self.bucket_seconds
+        return max(now, self._next_allowed)
+
+
+# At most `limit` seconds of play per local calendar day, on the given weekdays.
+class DayQuota:
+    __slots__ = ("limit", "days", "day_start", "day_end", "weekday", "used")
+
+    def __init__(self, limit_seconds, days=range(7)):
+        self.limit = limit_seconds
+        self.days = frozenset(days)
+        self.day_start = 0.0
+        self.day_end = 0.0
+        self.weekday = None
+        self.used = 0.0
+
+    def _advance(self, now):
+        if now >= self.day_end:
+            self.day_end = next_midnight(now)
+            self.day_start = next_midnight(self.day_end - 36 * 3600)
+            self.weekday = datetime.fromtimestamp(now).weekday()
+            self.used = 0.0
+
+    def add(self, start, end):
+        self._advance(end)
+        self.used += max(0.0, end - max(start, self.day_start))
+
+    def remaining(self, now):
+        self._advance(now)
+        if self.weekday not in self.days:
+            return None
+        return max(0.0, self.limit - self.used)
+
+    def next_allowed(self, now):
+        remaining = self.remaining(now)
+        if remaining is None or remaining >= MIN_PLAY_SECONDS:
+            return now
+        return self.day_end
+
+
+def parse_rule(rule):
+    if not isinstance(rule, dict):
+        return None
+    minutes = rule.get("max_minutes")
+    if not isinstance(minutes, (int, float)) or minutes < 0:
+        return None
+    hours = rule.get("window_hours")
+    if isinstance(hours, (int, float)) and hours > 0:
+        return WindowQuota(hours * 3600, minutes * 60)
+    if rule.get("per") == "day":
+        days = rule.get("days", WEEKDAYS)
+        if not isinstance(days, (list, tuple)):
+            return None
+        indexes = [WEEKDAYS.index(day) for day in days if day in WEEKDAYS]
+        return DayQuota(minutes * 60, indexes)
+    return None
+
+
+class QuotaEngine:
+    def __init__(self, rules=()):
+        self.quotas = []
+        for rule in rules:
+            quota = parse_rule(rule)
+            if quota is not None:
+                self.quotas.append(quota)
+
+    def __bool__(self):
+        return bool(self.quotas)
+
+    def lookback_seconds(self):
+        # Sessions that started up to a day before the longest window can
+        # still overlap it.
+        lookback = 86400
+        for quota in self.quotas:
+            if isinstance(quota, WindowQuota):
+                lookback = max(lookback, quota.window)
+        return lookback + 86400
+
+    def seed(self, sessions):
+        for start_ts, duration in sessions:
+            self.add(start_ts, start_ts + duration)
+
+    def add(self, start, end):
+        for quota in self.quotas:
+            quota.add(start, end)
+
+    def remaining(self, now):
+        remaining = None
+        for quota in self.quotas:
+            value = quota.remaining(now)
+            if value is not None and (remaining is None or value < remaining):
+                remaining = value
+        return remaining
+
+    def next_allowed(self, now):
+        return max((quota.next_allowed(now) for quota in self.quotas), default=now)
@@ -0,0 +1,208 @@
+import os
+import time
+from array import array
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+RESOURCE_RING_SIZE = 120
+MAX_TREE_PROCESSES = 256
+
+
+def format_bytes(value):
+    for unit in ("B", "KiB", "MiB"):
+        if value < 1024:
+            return f"{value:.0f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GiB"
+
+
+class ResourceSummary:
+    __slots__ = ("samples", "cpu_avg", "cpu_peak", "rss_avg", "rss_peak", "procs_peak")
+
+    def __init__(self, samples, cpu_avg, cpu_peak, rss_avg, rss_peak, procs_peak):
+        self.samples = samples
+        self.cpu_avg = cpu_avg
+        self.cpu_peak = cpu_peak
+        self.rss_avg = rss_avg
+        self.rss_peak = rss_peak
+        self.procs_peak = procs_peak
+
+    def describe(self):
+        return (
+            f"CPU {self.cpu_avg:.0f}% avg / {self.cpu_peak:.0f}% peak, "
+            f"RSS {format_bytes(self.rss_avg)} avg / {format_bytes(self.rss_peak)} peak, "
+            f"{self.procs_peak} proc(s)"
+        )
+
+
+# Fixed-size history of one game's samples. The ring keeps the most recent
+# samples for display; the running totals cover the whole session so the
+# summary does not depend on the ring size.
+class ResourceRing:
+    __slots__ = (
+        "size",
+        "cpu",
+        "rss",
+        "procs",
+        "head",
+        "count",
+        "total",
+        "cpu_sum",
+        "cpu_peak",
+        "rss_sum",
+        "rss_peak",
+        "procs_peak",
+        "processes",
+        "cpu_seconds",
+        "last_sample",
+    )
+
+    def __init__(self, size=RESOURCE_RING_SIZE):
+        self.size = size
+        self.cpu = array("d", bytes(8 * size))
+        self.rss = array("d", bytes(8 * size))
+        self.procs = array("H", bytes(2 * size))
+        self.reset()
+
+    def reset(self):
+        self.head = 0
+        self.count = 0
+        self.total = 0
+        self.cpu_sum = 0.0
+        self.cpu_peak = 0.0
+        self.rss_sum = 0.0
+        self.rss_peak = 0.0
+        self.procs_peak = 0
+        self.processes = {}
+        self.cpu_seconds = {}
+        self.last_sample = None
+
+    def add(self, cpu, rss, procs):
+        self.cpu[self.head] = cpu
+        self.rss[self.head] = rss
+        self.procs[self.head] = min(procs, 0xFFFF)
+        self.head = (self.head + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+        self.total += 1
+        self.cpu_sum += cpu
+        self.rss_sum += rss
+        self.cpu_peak = max(self.cpu_peak, cpu)
+        self.rss_peak = max(self.rss_peak, rss)
+        self.procs_peak = max(self.procs_peak, procs)
+
+    def recent(self):
+        start = (self.head - self.count) % self.size
+        return [
+            (self.cpu[i % self.size], self.rss[i % self.size], self.procs[i % self.size])
+            for i in range(start, start + self.count)
+        ]
+
+    def recent_summary(self):
+        # Only the samples still in the ring, i.e. the last few minutes.
+        samples = self.recent()
+        if not samples:
+            return None
+        cpu, rss, procs = zip(*samples)
+        return ResourceSummary(
+            len(samples),
+            sum(cpu) / len(samples),
+            max(cpu),
+            sum(rss) / len(samples),
+            max(rss),
+            max(procs),
+        )
+
+    def summary(self):
+        if not self.total:
+            return None
+        return ResourceSummary(
+            self.total,
+            self.cpu_sum / self.total,
+            self.cpu_peak,
+            self.rss_sum / self.total,
+            self.rss_peak,
+            self.procs_peak,
+        )
+
+
+def proc_children_available():
+    pid = os.getpid()
+    return os.path.exists(f"/proc/{pid}/task/{pid}/children")
+
+
+def proc_children(pid):
+    children = []
+    try:
+        tasks = os.listdir(f"/proc/{pid}/task")
+        for tid in tasks:
+            with open(f"/proc/{pid}/task/{tid}/children", "rb") as f:
+                children.extend(int(child) for child in f.read().split())
+    except (OSError, ValueError):
+        return []
+    return children
+
+
+def proc_tree(root_pids, limit=MAX_TREE_PROCESSES):
+    # Breadth-first through /proc; the roots themselves are included.
+    pids = list(root_pids)
+    index = 0
+    while index < len(pids) and len(pids) < limit:
+        pids.extend(proc_children(pids[index]))
+        index += 1
+    return pids
+
+
+# Samples only the process tree of each tracked session. On Linux the tree is
+# walked through /proc/<pid>/task/<tid>/children. Elsewhere psutil can only
+# find children by enumerating every process, so only the tracked process
+# itself is sampled.
+class ResourceSampler:
+    def __init__(self, interval, clock=time.monotonic):
+        self.interval = interval
+        self.clock = clock
+        self.next_sample = None
+        self.proc_children = proc_children_available()
+
+    def due(self):
+        now = self.clock()
+        if self.next_sample is not None and now < self.next_sample:
+            return False
+        self.next_sample = now + self.interval
+        return True
+
+    def tree(self, root_pid):
+        if self.proc_children:
+            return proc_tree([root_pid])
+        return [root_pid]
+
+    def sample(self, ring, root_pid):
+        now = self.clock()
+        cpu_seconds = {}
+        rss = 0
+        for pid in self.tree(root_pid):
+            proc = ring.processes.get(pid)
+            try:
+                if proc is None:
+                    proc = psutil.Process(pid)
+                with proc.oneshot():
+                    times = proc.cpu_times()
+                    memory = proc.memory_info()
+            except psutil.Error:
+                continue
+            ring.processes[pid] = proc
+            cpu_seconds[pid] = times.user + times.system
+            rss += memory.rss
+        for pid in ring.processes.keys() - cpu_seconds.keys():
+            del ring.processes[pid]
+
+        # The first sample of a session only sets the CPU time baseline.
+        previous, last_sample = ring.cpu_seconds, ring.last_sample
+        ring.cpu_seconds = cpu_seconds
+        ring.last_sample = now
+        if last_sample is None or now <= last_sample or not cpu_seconds:
+            return
+        used = sum(seconds - previous.get(pid, seconds) for pid, seconds in cpu_seconds.items())
+        ring.add(max(0.0, used) / (now - last_sample) * 100, rss, len(cpu_seconds))
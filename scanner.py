@@ -0,0 +1,135 @@
+import math
+import time
+from collections import deque
+
+DEFAULT_BUDGET_SECONDS = 0.004
+DEFAULT_MAX_STALENESS_SECONDS = 10.0
+TICK_INTERVAL_SMOOTHING = 0.2
+
+
+# Spreads process-table reads across ticks. Each refresh() lists the pids,
+# which is cheap, and reads full process info only for:
+# - tracked session pids
+# - new pids
+# - a round-robin slice of the rest, within the time budget
+# The slice is never smaller than what is needed to finish the current pass
+# within max_staleness, so identifier matches are never older than that.
+class BudgetedScanner:
+    def __init__(
+        self,
+        backend,
+        budget_seconds=DEFAULT_BUDGET_SECONDS,
+        max_staleness=DEFAULT_MAX_STALENESS_SECONDS,
+        clock=time.monotonic,
+    ):
+        self.backend = backend
+        self.name = f"{backend.name}+budget"
+        self.budget_seconds = budget_seconds
+        self.max_staleness = max_staleness
+        self.clock = clock
+        self.table = {}
+        self.unreadable = set()
+        self.queue = deque()
+        self.queued = set()
+        self.pass_started = None
+        self.pass_seconds = None
+        self.last_refresh = None
+        self.tick_interval = None
+        self.last_reads = 0
+        self.last_seconds = 0.0
+        self.coverage = 0.0
+
+    def configure(self, budget_seconds, max_staleness):
+        self.budget_seconds = budget_seconds
+        self.max_staleness = max_staleness
+
+    def _read(self, pid):
+        info = self.backend.read_process(pid)
+        if info is None:
+            self.table.pop(pid, None)
+            self.unreadable.add(pid)
+        else:
+            self.table[pid] = info
+            self.unreadable.discard(pid)
+
+    def refresh(self, priority_pids=()):
+        started = self.clock()
+        if self.last_refresh is not None:
+            interval = started - self.last_refresh
+            if self.tick_interval is None:
+                self.tick_interval = interval
+            else:
+                self.tick_interval += (interval - self.tick_interval) * TICK_INTERVAL_SMOOTHING
+        self.last_refresh = started
+
+        pids = set(self.backend.list_pids())
+        for pid in self.table.keys() - pids:
+            del self.table[pid]
+        self.unreadable &= pids
+        reads = 0
+        for pid in priority_pids:
+            if pid in pids:
+                self._read(pid)
+                reads += 1
+        # Before the first pass everything is queued, so startup is spread out
+        # across ticks as well.
+        if self.pass_started is not None:
+            for pid in pids - self.table.keys() - self.unreadable - self.queued:
+                self._read(pid)
+                reads += 1
+
+        if not self.queue:
+            if self.pass_started is not None:
+                self.pass_seconds = started - self.pass_started
+            self.pass_started = started
+            self.queue = deque(pids)
+            self.queued = set(pids)
+
+        deadline = started + self.budget_seconds
+        minimum = self._minimum_reads(started)
+        sliced = 0
+        while self.queue and (sliced < minimum or self.clock() < deadline):
+            pid = self.queue.popleft()
+            self.queued.discard(pid)
+            if pid in pids:
+                self._read(pid)
+                reads += 1
+                sliced += 1
+
+        self.last_reads = reads
+        self.last_seconds = self.clock() - started
+        self.coverage = min(1.0, reads / len(self.table)) if self.table else 1.0
+
+    def _minimum_reads(self, now):
+        if not self.queue:
+            return 0
+        if self.tick_interval is None or self.tick_interval <= 0:
+            return 0
+        time_left = self.pass_started + self.max_staleness - now
+        ticks_left = max(1, int(time_left / self.tick_interval))
+        return math.ceil(len(self.queue) / ticks_left)
+
+    @property
+    def detection_delay(self):
+        # Worst case until an exec into a game is matched by identifier: one
+        # full pass. New pids are read on the tick they first show up.
+        if self.pass_seconds is None:
+            return self.max_staleness
+        return min(self.max_staleness, max(self.pass_seconds, self.tick_interval or 0.0))
+
+    def iter_processes(self):
+        # Until a first pass has finished the table is partial, and a pid
+        # missing from it would read as an exited game. The first caller
+        # reads the whole table at once instead and completes the pass.
+        if self.pass_seconds is None:
+            started = self.clock()
+            self.table = {info.pid: info for info in self.backend.iter_processes()}
+            self.unreadable.clear()
+            self.queue.clear()
+            self.queued.clear()
+            self.pass_started = started
+            self.pass_seconds = self.clock() - started
+        return iter(list(self.table.values()))
+
+    def close(self):
+        self.backend.close()
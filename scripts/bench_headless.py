@@ -0,0 +1,92 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Each child measures its own startup, from the first import until it is ready
+# to enforce, and reports its resident set size at that point.
+PRELUDE = """
+import json, os, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {root!r})
+"""
+
+REPORT = """
+import psutil
+print(json.dumps({
+    "startup": time.perf_counter() - started,
+    "rss": psutil.Process().memory_info().rss,
+    "tkinter": "tkinter" in sys.modules,
+}))
+"""
+
+MODES = {
+    "gui": """
+import tkinter as tk
+import app
+root = tk.Tk()
+timer = app.TimerApp(root)
+root.update()
+""",
+    "headless": """
+import headless
+timer = headless.HeadlessTimer()
+timer.tick()
+""",
+}
+
+
+def run_mode(mode, home):
+    env = dict(os.environ)
+    for env_name in ("HOME", "USERPROFILE", "APPDATA"):
+        env[env_name] = home
+    code = PRELUDE.format(root=ROOT_DIR) + MODES[mode] + REPORT
+    result = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True, check=False
+    )
+    if result.returncode != 0:
+        lines = result.stderr.strip().splitlines()
+        raise RuntimeError(lines[-1] if lines else f"exit code {result.returncode}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare GUI and headless startup and memory.")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    home = tempfile.mkdtemp(prefix="pctimer-bench-")
+    results = {}
+    for mode in MODES:
+        samples = []
+        try:
+            for _ in range(args.runs):
+                samples.append(run_mode(mode, home))
+        except RuntimeError as exc:
+            print(f"{mode}: unavailable ({exc})")
+            continue
+        startup = statistics.median(sample["startup"] for sample in samples)
+        rss = statistics.median(sample["rss"] for sample in samples)
+        results[mode] = (startup, rss)
+        print(
+            f"{mode}: startup={startup * 1000:.1f} ms rss={rss / (1024 * 1024):.1f} MiB"
+            f" tkinter_loaded={samples[0]['tkinter']}"
+        )
+
+    if len(results) == len(MODES):
+        gui_startup, gui_rss = results["gui"]
+        headless_startup, headless_rss = results["headless"]
+        print(
+            f"headless vs gui: {gui_startup / headless_startup:.1f}x faster startup,"
+            f" {(gui_rss - headless_rss) / (1024 * 1024):.1f} MiB less resident"
+        )
+    return 0 if "headless" in results else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,410 @@
+import argparse
+import collections
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+TEMP_HOME = tempfile.mkdtemp(prefix="pctimer-replay-")
+for env_name in ("HOME", "USERPROFILE", "APPDATA"):
+    os.environ[env_name] = TEMP_HOME
+
+import tkinter as tk  # noqa: E402
+
+import app  # noqa: E402
+import tracing  # noqa: E402
+from launcher import LaunchResult  # noqa: E402
+
+
+# Inputs recorded while handling an entry are bucketed by kind, so a replay
+# that consumes a few more or fewer values than the original run falls back to
+# the last known value instead of drifting out of step with the trace.
+class TraceFeed:
+    def __init__(self, path):
+        self.reader = tracing.TraceReader(path)
+        self.clock = 0.0
+        self.paths = {}
+        self.table = {}
+        self.clocks = collections.deque()
+        self.alive = collections.deque()
+        self.scans = collections.deque()
+        self.launches = collections.deque()
+        self.indexes = collections.deque()
+        self.pid_lists = collections.deque()
+        self.pids = []
+        self.reads = {}
+        self.settings = collections.deque()
+        self.last_settings = None
+        self.watches = collections.deque()
+        self.trees = collections.deque()
+        self.pending = self.reader.read()
+        self.first_clock = None
+
+    def next_entry(self):
+        self.settle()
+        kind, payload = self.pending
+        if kind is None:
+            return None, None
+        ops = []
+        while True:
+            record, value = self.reader.read()
+            if record is None or record in tracing.ENTRY_RECORDS:
+                self.pending = (record, value)
+                break
+            if record == tracing.REC_CLOCK:
+                self.clocks.append(value)
+            elif record == tracing.REC_PATH:
+                self.paths[value[0]] = value[1]
+            elif record == tracing.REC_PID_ALIVE:
+                self.alive.append(value)
+            elif record in (tracing.REC_PROC_ADD, tracing.REC_PROC_REMOVE):
+                ops.append((record, value))
+            elif record == tracing.REC_SCAN_END:
+                self.scans.append(ops)
+                ops = []
+            elif record == tracing.REC_LAUNCH:
+                self.launches.append(value)
+            elif record == tracing.REC_INDEX:
+                self.indexes.append(value)
+            elif record == tracing.REC_PIDS:
+                self.pid_lists.append(value)
+            elif record == tracing.REC_READ:
+                self.reads[value[0]] = value[1]
+            elif record == tracing.REC_SETTINGS:
+                self.settings.append(value)
+            elif record == tracing.REC_WATCH:
+                self.watches.append(value)
+            elif record == tracing.REC_TREE:
+                self.trees.append(value)
+        if kind == tracing.REC_INIT:
+            self.clock = payload["clock"]
+            self.first_clock = self.clock
+            self.last_settings = payload.get("settings")
+        return kind, payload
+
+    def settle(self):
+        while self.scans:
+            self.apply_scan(self.scans.popleft())
+        if self.clocks:
+            self.clock = self.clocks[-1]
+            self.clocks.clear()
+        self.alive.clear()
+        self.launches.clear()
+        self.indexes.clear()
+        if self.pid_lists:
+            self.pids = self.pid_lists[-1]
+            self.pid_lists.clear()
+        if self.settings:
+            self.last_settings = self.settings[-1]
+            self.settings.clear()
+        self.watches.clear()
+        self.trees.clear()
+
+    def apply_scan(self, ops):
+        for record, value in ops:
+            if record == tracing.REC_PROC_ADD:
+                self.table[value.pid] = value
+            else:
+                self.table.pop(value, None)
+
+    def now(self):
+        if self.clocks:
+            self.clock = self.clocks.popleft()
+        return self.clock
+
+    def path_exists(self, path):
+        return self.paths.get(path, False)
+
+    def pid_alive(self):
+        return self.alive.popleft() if self.alive else False
+
+    def iter_processes(self):
+        if self.scans:
+            self.apply_scan(self.scans.popleft())
+        return iter(list(self.table.values()))
+
+    def list_pids(self):
+        if self.pid_lists:
+            self.pids = self.pid_lists.popleft()
+        return list(self.pids)
+
+    def read_process(self, pid):
+        return self.reads.get(pid)
+
+    def read_settings(self, path):
+        if self.settings:
+            self.last_settings = self.settings.popleft()
+        return self.last_settings
+
+    def session_tree(self):
+        return set(self.trees.popleft()) if self.trees else set()
+
+    def settings_changed(self):
+        return self.watches.popleft() if self.watches else False
+
+    def launch_results(self):
+        return self.launches.popleft() if self.launches else []
+
+    def exe_index(self):
+        return self.indexes.popleft() if self.indexes else None
+
+
+class ReplayProcessBackend:
+    name = "replay"
+
+    def __init__(self, feed):
+        self.feed = feed
+
+    def iter_processes(self):
+        return self.feed.iter_processes()
+
+    def list_pids(self):
+        return self.feed.list_pids()
+
+    def read_process(self, pid):
+        return self.feed.read_process(pid)
+
+    def close(self):
+        return
+
+
+class ReplaySettingsWatcher:
+    def __init__(self, feed):
+        self.feed = feed
+
+    def poll(self):
+        return self.feed.settings_changed()
+
+    def close(self):
+        return
+
+
+class ReplayLaunchPipeline:
+    def __init__(self, feed, timer):
+        self.feed = feed
+        self.timer = timer
+        self.pending = 0
+
+    def launch(self, target, name, argv, paths, identifiers, helper=False):
+        self.pending += 1
+
+    def poll(self):
+        results = []
+        for game_index, status, pid, create_time, latency in self.feed.launch_results():
+            results.append(
+                LaunchResult(
+                    self.timer.game_states[game_index],
+                    status,
+                    pid=pid,
+                    create_time=create_time,
+                    latency=latency,
+                )
+            )
+        self.pending = max(0, self.pending - len(results))
+        return results
+
+
+class ReplayTimerApp(app.TimerApp):
+    def __init__(self, root, feed):
+        self.feed = feed
+        self.initializing = True
+        self.session_reasons = collections.Counter()
+        self.kills = 0
+        super().__init__(root)
+        self.settings_watcher.close()
+        self.settings_watcher = ReplaySettingsWatcher(feed)
+        self.initializing = False
+        self.launch_pipeline = ReplayLaunchPipeline(feed, self)
+
+    def apply_init(self, payload):
+        self.saved_paths = dict(payload["saved_paths"])
+        profile_info = payload["profile"]
+        profile = self.profile_store.find_profile(profile_info["name"])
+        if profile is None:
+            profile = self.profile_store.create_profile(profile_info["name"])
+        self.profile_store.set_allowance(profile, profile_info["daily_allowance_minutes"])
+        remaining = profile_info["allowance_remaining"]
+        if remaining is not None:
+            used = profile.daily_allowance_minutes * 60 - remaining
+            if used > 0:
+                self.profile_store.record_session(
+                    profile, self.feed.clock, used, "replay", "Replay"
+                )
+        self.profile_store.set_cooldown(profile, payload["cooldown_until"])
+        self.profile = profile
+        self.load_profile_state()
+        recorded_quota = payload.get("quota_remaining")
+        if self.quotas is not None and recorded_quota is not None:
+            used = self.quotas.remaining(self.feed.clock) - recorded_quota
+            if used > 0:
+                self.quotas.add(self.feed.clock - used, self.feed.clock)
+                self.quota_remaining = self.quotas.remaining(self.feed.clock)
+
+        for state, game in zip(self.game_states, payload["games"]):
+            state.path_var.set(game["path"])
+            state.time_var.set(game["time"])
+            state.status_var.set(game["status"])
+            if game["running"]:
+                self.begin_session(state, None, game["pid"], game["start_ts"], game["end_ts"])
+        self.exe_index_dirty = True
+        self.refresh_controls()
+
+    def tick(self):
+        if self.initializing:
+            return
+        super().tick()
+
+    def detect_paths(self):
+        if self.initializing:
+            return
+        super().detect_paths()
+
+    def restore_session_snapshot(self):
+        return
+
+    def configure_sampler(self):
+        # Resource samples read live processes, which are not in the trace.
+        self.resource_sampler = None
+
+    def rebuild_exe_index(self):
+        mappings = self.feed.exe_index()
+        if mappings is not None:
+            self.exe_index.by_path = dict(mappings[0])
+            self.exe_index.by_identity = {}
+            self.exe_index.by_bundle = dict(mappings[1])
+            self.exe_index._cache = {}
+        self.exe_index_dirty = False
+
+    def pid_alive(self, state):
+        return self.feed.pid_alive()
+
+    def tracked_process(self, state):
+        return None
+
+    def proc_session_tree(self, roots):
+        return self.feed.session_tree()
+
+    def kill_game_process(self, state):
+        if not state.config.kill_process_on_timeout:
+            return
+        self.kills += 1
+        for _info in self.process_backend.iter_processes():
+            pass
+
+    def finish_session(self, state, reason):
+        self.session_reasons[reason] += 1
+        super().finish_session(state, reason)
+
+    def save_session_snapshot(self):
+        return
+
+    def update_overlay(self, remaining_seconds):
+        self.overlay_visible = remaining_seconds is not None
+
+    def set_system_lockdown(self, enabled):
+        return
+
+    def restore_if_locked(self):
+        return
+
+    def ensure_fullscreen(self):
+        return
+
+    def on_unmap(self, event=None):
+        return
+
+    def on_map(self, event=None):
+        return
+
+    def on_visibility(self, event):
+        return
+
+    def on_focus_out(self, event=None):
+        return
+
+
+def dispatch(timer, kind, payload):
+    if kind == tracing.REC_TICK:
+        timer.tick()
+        timer.root.after_cancel(timer.tick_job)
+    elif kind == tracing.REC_START:
+        game_index, path, minutes = payload
+        state = timer.game_states[game_index]
+        state.path_var.set(path)
+        state.time_var.set(minutes)
+        timer.start_game(state)
+    elif kind == tracing.REC_STOP:
+        game_index, manual = payload
+        timer.stop_game(timer.game_states[game_index], manual=manual)
+    elif kind == tracing.REC_RESET_COOLDOWN:
+        timer.clear_cooldown()
+    elif kind == tracing.REC_SWITCH_PROFILE:
+        name = payload[0]
+        profile = timer.profile_store.find_profile(name)
+        if profile is None and name:
+            profile = timer.profile_store.create_profile(name)
+        timer.switch_profile(profile)
+    elif kind == tracing.REC_RESCAN:
+        timer.detect_paths()
+    elif kind == tracing.REC_POLL_LAUNCHES:
+        timer.poll_launches()
+    elif kind == tracing.REC_ADD_GAME:
+        timer.add_custom_game(*payload)
+    if timer.launch_poll_job is not None:
+        timer.root.after_cancel(timer.launch_poll_job)
+        timer.launch_poll_job = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a PC Timer trace as fast as possible.")
+    parser.add_argument("trace", help="trace recorded with app.py --record-trace")
+    args = parser.parse_args(argv)
+
+    feed = TraceFeed(args.trace)
+    kind, init = feed.next_entry()
+    if kind != tracing.REC_INIT:
+        print(f"{args.trace} does not start with an init record.", file=sys.stderr)
+        return 2
+
+    app.now_ts = feed.now
+    app.path_exists = feed.path_exists
+    app.read_settings = feed.read_settings
+    app.create_process_backend = lambda: ReplayProcessBackend(feed)
+
+    root = tk.Tk()
+    root.withdraw()
+    timer = ReplayTimerApp(root, feed)
+    timer.apply_init(init)
+
+    entries = 0
+    ticks = 0
+    started = time.perf_counter()
+    while True:
+        kind, payload = feed.next_entry()
+        if kind is None:
+            break
+        dispatch(timer, kind, payload)
+        entries += 1
+        if kind == tracing.REC_TICK:
+            ticks += 1
+    wall = time.perf_counter() - started
+
+    timer.profile_store.close()
+    root.destroy()
+
+    simulated = feed.clock - feed.first_clock
+    print(f"entries={entries} ticks={ticks}")
+    print(f"simulated={simulated:.1f}s wall={wall:.3f}s speedup={simulated / max(wall, 1e-9):.0f}x")
+    if ticks:
+        print(f"per_tick={wall / ticks * 1_000_000:.1f}us")
+    for reason, count in sorted(timer.session_reasons.items()):
+        print(f"sessions[{reason}]={count}")
+    print(f"kills={timer.kills}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+import argparse
+import gc
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+TEMP_HOME = tempfile.mkdtemp(prefix="pctimer-soak-")
+for env_name in ("HOME", "USERPROFILE", "APPDATA"):
+    os.environ[env_name] = TEMP_HOME
+
+import tkinter as tk  # noqa: E402
+
+import analytics  # noqa: E402
+import app  # noqa: E402
+import launcher  # noqa: E402
+from process_backend import ProcessInfo  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self, start):
+        self.value = start
+
+    def __call__(self):
+        return self.value
+
+    def advance(self, seconds):
+        self.value += seconds
+
+
+class FakePopen:
+    def __init__(self, pid):
+        self.pid = pid
+
+    def poll(self):
+        return None
+
+
+class SimulatedProcessBackend:
+    name = "simulated"
+
+    def __init__(self):
+        self.table = {}
+
+    def spawn(self, pid, name, exe):
+        self.table[pid] = ProcessInfo(pid, name, exe, [exe])
+
+    def exit(self, pid):
+        self.table.pop(pid, None)
+
+    def iter_processes(self):
+        return iter(list(self.table.values()))
+
+    def close(self):
+        self.table.clear()
+
+
+def unused_pid():
+    pid = 3_999_999
+    while app.psutil.pid_exists(pid):
+        pid -= 1
+    return pid
+
+
+def run_cycle(timer, state, backend, clock, pid, index):
+    timer.clear_cooldown()
+    state.time_var.set("1.50")
+    # The game path is indexed, so the process must run that executable.
+    backend.spawn(pid, "minecraft", state.path)
+    subprocess.Popen = lambda _args: FakePopen(pid)
+    timer.start_game(state)
+    wait_for_launch(timer, state)
+    if not state.running:
+        raise RuntimeError(f"Session did not start: {state.status_var.get()}")
+
+    clock.advance(40)
+    drive_tick(timer)
+    if not timer.overlay_visible:
+        raise RuntimeError("Overlay did not appear inside the warning window")
+
+    variant = index % 3
+    if variant == 0:
+        clock.advance(60)
+    elif variant == 1:
+        backend.exit(pid)
+    else:
+        timer.stop_game(state, manual=True)
+    drive_tick(timer)
+    if state.running:
+        raise RuntimeError("Session did not end")
+    backend.exit(pid)
+
+    drive_tick(timer)
+    if timer.overlay_visible:
+        raise RuntimeError("Overlay still visible after session end")
+
+
+def wait_for_launch(timer, state):
+    deadline = time.monotonic() + 5
+    while state.launching and time.monotonic() < deadline:
+        time.sleep(0.001)
+        if timer.launch_poll_job is not None:
+            timer.root.after_cancel(timer.launch_poll_job)
+        timer.poll_launches()
+
+
+def drive_tick(timer):
+    timer.tick()
+    timer.root.after_cancel(timer.tick_job)
+    timer.root.update()
+
+
+def retained_bytes(before, after):
+    stats = after.compare_to(before, "filename")
+    return sum(stat.size_diff for stat in stats), stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memory soak test for PC Timer.")
+    parser.add_argument("--cycles", type=int, default=3000)
+    parser.add_argument("--warmup", type=int, default=300)
+    parser.add_argument("--max-growth-kb", type=float, default=64.0)
+    args = parser.parse_args(argv)
+
+    if app.psutil is None:
+        print("psutil is required for the soak test.", file=sys.stderr)
+        return 2
+
+    clock = FakeClock(app.now_ts())
+    app.now_ts = clock
+    # FakePopen never exits, so there is nothing to wait out before ready.
+    launcher.DIRECT_READY_SECONDS = 0
+
+    root = tk.Tk()
+    timer = app.TimerApp(root)
+    root.after_cancel(timer.tick_job)
+    backend = SimulatedProcessBackend()
+    timer.process_backend.close()
+    timer.process_backend = backend
+
+    state = timer.game_states[0]
+    state.path_var.set(sys.executable)
+    pid = unused_pid()
+
+    for index in range(args.warmup):
+        run_cycle(timer, state, backend, clock, pid, index)
+
+    # Session history columns grow by design, one row per session.
+    filters = [tracemalloc.Filter(False, analytics.__file__), tracemalloc.Filter(False, __file__)]
+    tracemalloc.start(10)
+    gc.collect()
+    before = tracemalloc.take_snapshot().filter_traces(filters)
+
+    for index in range(args.cycles):
+        run_cycle(timer, state, backend, clock, pid, args.warmup + index)
+
+    gc.collect()
+    after = tracemalloc.take_snapshot().filter_traces(filters)
+    tracemalloc.stop()
+    growth, stats = retained_bytes(before, after)
+
+    timer.profile_store.close()
+    root.destroy()
+
+    print(f"cycles={args.cycles} retained_growth={growth / 1024:.1f} KiB")
+    if growth > args.max_growth_kb * 1024:
+        for stat in stats[:10]:
+            print(stat)
+        print(f"FAIL: retained memory grew more than {args.max_growth_kb:.0f} KiB")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
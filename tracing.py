@@ -0,0 +1,548 @@
+import json
+import struct
+
+from process_backend import ProcessInfo
+
+
+TRACE_MAGIC = b"PCTT\x02"
+
+# Input records: values the app consumed while handling the preceding entry.
+REC_STRING = 0x01
+REC_CLOCK = 0x10
+REC_PROC_ADD = 0x11
+REC_PROC_REMOVE = 0x12
+REC_SCAN_END = 0x13
+REC_PATH = 0x14
+REC_PID_ALIVE = 0x15
+REC_LAUNCH = 0x16
+REC_INDEX = 0x17
+REC_PIDS = 0x18
+REC_READ = 0x19
+REC_SETTINGS = 0x1A
+REC_WATCH = 0x1B
+REC_TREE = 0x1C
+REC_INIT = 0x20
+
+# Entry records: calls into the app from the event loop or the user.
+REC_TICK = 0x30
+REC_START = 0x31
+REC_STOP = 0x32
+REC_RESET_COOLDOWN = 0x33
+REC_SWITCH_PROFILE = 0x34
+REC_RESCAN = 0x35
+REC_POLL_LAUNCHES = 0x36
+REC_ADD_GAME = 0x37
+
+ENTRY_RECORDS = frozenset(
+    (
+        REC_INIT,
+        REC_TICK,
+        REC_START,
+        REC_STOP,
+        REC_RESET_COOLDOWN,
+        REC_SWITCH_PROFILE,
+        REC_RESCAN,
+        REC_POLL_LAUNCHES,
+        REC_ADD_GAME,
+    )
+)
+
+DOUBLE = struct.Struct("<d")
+FLOAT = struct.Struct("<f")
+
+
+def encode_varint(value, out):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def zigzag(value):
+    return (value << 1) if value >= 0 else ((-value << 1) - 1)
+
+
+def unzigzag(value):
+    return (value >> 1) if not value & 1 else -((value + 1) >> 1)
+
+
+class TraceWriter:
+    def __init__(self, path):
+        self.file = open(path, "wb")
+        self.file.write(TRACE_MAGIC)
+        self.strings = {}
+        self.last_clock_us = 0
+        self.buf = bytearray()
+
+    def _string(self, value):
+        value = value or ""
+        sid = self.strings.get(value)
+        if sid is None:
+            sid = len(self.strings)
+            self.strings[value] = sid
+            data = value.encode("utf-8", "replace")
+            self.buf.append(REC_STRING)
+            encode_varint(len(data), self.buf)
+            self.buf += data
+        return sid
+
+    def _ids(self, strings):
+        return [self._string(value) for value in strings]
+
+    def clock(self, value):
+        us = int(round(value * 1_000_000))
+        self.buf.append(REC_CLOCK)
+        encode_varint(zigzag(us - self.last_clock_us), self.buf)
+        self.last_clock_us = us
+
+    def process_added(self, info):
+        ids = self._ids([info.name, info.exe, *info.cmdline])
+        self.buf.append(REC_PROC_ADD)
+        encode_varint(info.pid, self.buf)
+        encode_varint(info.ppid, self.buf)
+        encode_varint(len(ids), self.buf)
+        for sid in ids:
+            encode_varint(sid, self.buf)
+
+    def pid_list(self, pids, kind=REC_PIDS):
+        self.buf.append(kind)
+        encode_varint(len(pids), self.buf)
+        previous = 0
+        for pid in sorted(pids):
+            encode_varint(pid - previous, self.buf)
+            previous = pid
+
+    def process_read(self, pid, info):
+        ids = self._ids([info.name, info.exe, *info.cmdline]) if info is not None else []
+        self.buf.append(REC_READ)
+        encode_varint(pid, self.buf)
+        encode_varint(info.ppid if info is not None else 0, self.buf)
+        encode_varint(len(ids), self.buf)
+        for sid in ids:
+            encode_varint(sid, self.buf)
+
+    def process_removed(self, pid):
+        self.buf.append(REC_PROC_REMOVE)
+        encode_varint(pid, self.buf)
+
+    def scan_end(self):
+        self.buf.append(REC_SCAN_END)
+
+    def path_check(self, path, exists):
+        sid = self._string(path)
+        self.buf.append(REC_PATH)
+        encode_varint(sid, self.buf)
+        self.buf.append(1 if exists else 0)
+
+    def settings(self, settings):
+        self._json(REC_SETTINGS, settings)
+
+    def settings_changed(self, changed):
+        self.buf.append(REC_WATCH)
+        self.buf.append(1 if changed else 0)
+
+    def pid_alive(self, alive):
+        self.buf.append(REC_PID_ALIVE)
+        self.buf.append(1 if alive else 0)
+
+    def launch_results(self, results):
+        status_ids = self._ids([result[1] for result in results])
+        self.buf.append(REC_LAUNCH)
+        encode_varint(len(results), self.buf)
+        for (game_index, _status, pid, create_time, latency), sid in zip(results, status_ids):
+            encode_varint(game_index, self.buf)
+            encode_varint(sid, self.buf)
+            encode_varint(pid or 0, self.buf)
+            self.buf += DOUBLE.pack(create_time if create_time is not None else -1.0)
+            self.buf += FLOAT.pack(latency if latency is not None else -1.0)
+
+    def exe_index(self, by_path, by_bundle):
+        pairs = [
+            [(self._string(path), self._string(game)) for path, game in mapping.items()]
+            for mapping in (by_path, by_bundle)
+        ]
+        self.buf.append(REC_INDEX)
+        for mapping in pairs:
+            encode_varint(len(mapping), self.buf)
+            for path_id, game_id in mapping:
+                encode_varint(path_id, self.buf)
+                encode_varint(game_id, self.buf)
+
+    def init(self, payload):
+        self._json(REC_INIT, payload)
+
+    def _json(self, kind, payload):
+        data = json.dumps(payload, ensure_ascii=True).encode("ascii")
+        self.buf.append(kind)
+        encode_varint(len(data), self.buf)
+        self.buf += data
+
+    def entry(self, kind, ints=(), strings=()):
+        ids = self._ids(strings)
+        self.buf.append(kind)
+        for value in ints:
+            encode_varint(value, self.buf)
+        for sid in ids:
+            encode_varint(sid, self.buf)
+
+    def flush(self):
+        if self.buf:
+            self.file.write(self.buf)
+            self.buf.clear()
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+class TraceReader:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.data = f.read()
+        if not self.data.startswith(TRACE_MAGIC):
+            raise ValueError(f"{path} is not a PC Timer trace")
+        self.pos = len(TRACE_MAGIC)
+        self.strings = []
+        self.clock_us = 0
+
+    def _varint(self):
+        data = self.data
+        shift = 0
+        value = 0
+        while True:
+            byte = data[self.pos]
+            self.pos += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+
+    def _str(self):
+        return self.strings[self._varint()]
+
+    def peek_kind(self):
+        while self.pos < len(self.data) and self.data[self.pos] == REC_STRING:
+            self.pos += 1
+            size = self._varint()
+            self.strings.append(self.data[self.pos : self.pos + size].decode("utf-8"))
+            self.pos += size
+        if self.pos >= len(self.data):
+            return None
+        return self.data[self.pos]
+
+    def read(self):
+        kind = self.peek_kind()
+        if kind is None:
+            return None, None
+        self.pos += 1
+        if kind == REC_CLOCK:
+            self.clock_us += unzigzag(self._varint())
+            return kind, self.clock_us / 1_000_000
+        if kind == REC_PROC_ADD:
+            pid = self._varint()
+            ppid = self._varint()
+            fields = [self._str() for _ in range(self._varint())]
+            return kind, ProcessInfo(pid, fields[0], fields[1], fields[2:], ppid)
+        if kind == REC_PROC_REMOVE:
+            return kind, self._varint()
+        if kind in (REC_PIDS, REC_TREE):
+            pids = []
+            pid = 0
+            for _ in range(self._varint()):
+                pid += self._varint()
+                pids.append(pid)
+            return kind, pids
+        if kind == REC_READ:
+            pid = self._varint()
+            ppid = self._varint()
+            fields = [self._str() for _ in range(self._varint())]
+            if not fields:
+                return kind, (pid, None)
+            return kind, (pid, ProcessInfo(pid, fields[0], fields[1], fields[2:], ppid))
+        if kind == REC_WATCH:
+            changed = bool(self.data[self.pos])
+            self.pos += 1
+            return kind, changed
+        if kind == REC_PATH:
+            path = self._str()
+            exists = bool(self.data[self.pos])
+            self.pos += 1
+            return kind, (path, exists)
+        if kind == REC_PID_ALIVE:
+            alive = bool(self.data[self.pos])
+            self.pos += 1
+            return kind, alive
+        if kind == REC_LAUNCH:
+            results = []
+            for _ in range(self._varint()):
+                game_index = self._varint()
+                status = self._str()
+                pid = self._varint() or None
+                create_time = DOUBLE.unpack_from(self.data, self.pos)[0]
+                latency = FLOAT.unpack_from(self.data, self.pos + DOUBLE.size)[0]
+                self.pos += DOUBLE.size + FLOAT.size
+                results.append(
+                    (
+                        game_index,
+                        status,
+                        pid,
+                        create_time if create_time >= 0 else None,
+                        latency if latency >= 0 else None,
+                    )
+                )
+            return kind, results
+        if kind == REC_INDEX:
+            mappings = []
+            for _ in range(2):
+                mapping = {}
+                for _ in range(self._varint()):
+                    path = self._str()
+                    mapping[path] = self._str()
+                mappings.append(mapping)
+            return kind, tuple(mappings)
+        if kind in (REC_INIT, REC_SETTINGS):
+            size = self._varint()
+            payload = json.loads(self.data[self.pos : self.pos + size].decode("ascii"))
+            self.pos += size
+            return kind, payload
+        if kind in (REC_START, REC_SWITCH_PROFILE, REC_STOP, REC_ADD_GAME):
+            return kind, self._entry_args(kind)
+        if kind in (REC_SCAN_END, REC_TICK, REC_RESET_COOLDOWN, REC_RESCAN, REC_POLL_LAUNCHES):
+            return kind, None
+        raise ValueError(f"Corrupt trace: unknown record 0x{kind:02x} at {self.pos - 1}")
+
+    def _entry_args(self, kind):
+        if kind == REC_START:
+            game_index = self._varint()
+            return (game_index, self._str(), self._str())
+        if kind == REC_STOP:
+            game_index = self._varint()
+            return (game_index, bool(self._varint()))
+        if kind == REC_ADD_GAME:
+            return (self._str(), self._str())
+        return (self._str(),)
+
+
+class RecordingProcessBackend:
+    def __init__(self, backend, writer):
+        self.backend = backend
+        self.writer = writer
+        self.name = backend.name
+        self.connector = getattr(backend, "connector", None)
+        self.known = {}
+
+    def iter_processes(self):
+        infos = list(self.backend.iter_processes())
+        current = {}
+        for info in infos:
+            current[info.pid] = info
+            previous = self.known.get(info.pid)
+            if (
+                previous is None
+                or previous.haystack != info.haystack
+                or previous.ppid != info.ppid
+            ):
+                self.writer.process_added(info)
+        for pid in self.known.keys() - current.keys():
+            self.writer.process_removed(pid)
+        self.writer.scan_end()
+        self.known = current
+        return iter(infos)
+
+    def list_pids(self):
+        pids = list(self.backend.list_pids())
+        self.writer.pid_list(pids)
+        return pids
+
+    def read_process(self, pid):
+        info = self.backend.read_process(pid)
+        self.writer.process_read(pid, info)
+        return info
+
+    def close(self):
+        self.backend.close()
+
+
+class TraceRecorder:
+    def __init__(self, path):
+        self.writer = TraceWriter(path)
+        self.depth = 0
+
+    def attach(self, module, timer):
+        writer = self.writer
+        states = timer.game_states
+        original_now = module.now_ts
+        writer.init(self.init_payload(timer, original_now()))
+
+        original_exists = module.path_exists
+        original_read_settings = module.read_settings
+
+        def now_ts():
+            value = original_now()
+            writer.clock(value)
+            return value
+
+        def path_exists(path):
+            exists = original_exists(path)
+            writer.path_check(path, exists)
+            return exists
+
+        def read_settings(path):
+            settings = original_read_settings(path)
+            writer.settings(settings)
+            return settings
+
+        module.now_ts = now_ts
+        module.path_exists = path_exists
+        module.read_settings = read_settings
+        # Wrap the innermost backend: a budgeted scanner reads through it with
+        # list_pids/read_process, and reconfiguring the scanner at runtime
+        # swaps the scanner in and out around it.
+        if timer.scanner is not None:
+            timer.scanner.backend = RecordingProcessBackend(timer.scanner.backend, writer)
+        else:
+            timer.process_backend = RecordingProcessBackend(timer.process_backend, writer)
+
+        watcher_poll = timer.settings_watcher.poll
+
+        def record_watcher_poll():
+            changed = watcher_poll()
+            writer.settings_changed(changed)
+            return changed
+
+        timer.settings_watcher.poll = record_watcher_poll
+
+        pid_alive = timer.pid_alive
+
+        def record_pid_alive(state):
+            alive = pid_alive(state)
+            writer.pid_alive(alive)
+            return alive
+
+        timer.pid_alive = record_pid_alive
+
+        proc_session_tree = timer.proc_session_tree
+
+        def record_session_tree(roots):
+            tree = proc_session_tree(roots)
+            writer.pid_list(tree, REC_TREE)
+            return tree
+
+        timer.proc_session_tree = record_session_tree
+
+        rebuild_exe_index = timer.rebuild_exe_index
+
+        def record_rebuild():
+            rebuild_exe_index()
+            writer.exe_index(timer.exe_index.by_path, timer.exe_index.by_bundle)
+
+        timer.rebuild_exe_index = record_rebuild
+
+        pipeline_poll = timer.launch_pipeline.poll
+
+        def record_poll():
+            results = pipeline_poll()
+            if not results:
+                return results
+            writer.launch_results(
+                [
+                    (
+                        states.index(result.target),
+                        result.status,
+                        result.pid,
+                        result.create_time,
+                        result.latency,
+                    )
+                    for result in results
+                ]
+            )
+            return results
+
+        timer.launch_pipeline.poll = record_poll
+
+        self.wrap_entry(timer, "tick", lambda: (REC_TICK, (), ()))
+        self.wrap_entry(timer, "poll_launches", lambda: (REC_POLL_LAUNCHES, (), ()))
+        self.wrap_entry(timer, "detect_paths", lambda: (REC_RESCAN, (), ()))
+        self.wrap_entry(timer, "clear_cooldown", lambda: (REC_RESET_COOLDOWN, (), ()))
+        self.wrap_entry(
+            timer,
+            "start_game",
+            lambda state: (
+                REC_START,
+                (states.index(state),),
+                (state.path_var.get(), state.time_var.get()),
+            ),
+        )
+        self.wrap_entry(
+            timer,
+            "stop_game",
+            lambda state, manual=False: (REC_STOP, (states.index(state), int(manual)), ()),
+        )
+        self.wrap_entry(
+            timer,
+            "add_custom_game",
+            lambda name, path: (REC_ADD_GAME, (), (name, path)),
+        )
+        self.wrap_entry(
+            timer,
+            "switch_profile",
+            lambda profile: (REC_SWITCH_PROFILE, (), (profile.name if profile else "",)),
+        )
+        # The first tick ran during construction and scheduled the unwrapped
+        # method, so hand the pending job over to the recording wrapper.
+        if timer.tick_job is not None:
+            timer.root.after_cancel(timer.tick_job)
+            timer.tick_job = timer.root.after(500, timer.tick)
+        writer.flush()
+
+    def wrap_entry(self, timer, name, describe):
+        method = getattr(timer, name)
+        writer = self.writer
+
+        def entry(*args, **kwargs):
+            outermost = self.depth == 0
+            if outermost:
+                kind, ints, strings = describe(*args, **kwargs)
+                writer.entry(kind, ints, strings)
+            self.depth += 1
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.depth -= 1
+                if outermost:
+                    writer.flush()
+
+        setattr(timer, name, entry)
+
+    def init_payload(self, timer, clock):
+        profile = timer.profile
+        return {
+            "clock": clock,
+            "saved_paths": timer.saved_paths,
+            "profile": {
+                "name": profile.name,
+                "daily_allowance_minutes": profile.daily_allowance_minutes,
+                "allowance_remaining": timer.allowance_remaining,
+            },
+            "cooldown_until": timer.cooldown_until,
+            "quota_remaining": timer.quota_remaining,
+            # Quotas, session_minutes, custom_games, the scan budget and so on.
+            "settings": timer.settings,
+            "games": [
+                {
+                    "name": state.config.name,
+                    "path": state.path_var.get(),
+                    "time": state.time_var.get(),
+                    "status": state.status_var.get(),
+                    "running": state.running,
+                    "pid": state.pid,
+                    "start_ts": state.start_ts,
+                    "end_ts": state.end_ts,
+                }
+                for state in timer.game_states
+            ],
+        }
+
+    def close(self):
+        self.writer.close()
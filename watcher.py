@@ -0,0 +1,110 @@
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+READ_SIZE = 4096
+
+
+def open_inotify():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        inotify_init1 = libc.inotify_init1
+        inotify_add_watch = libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    inotify_add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+    fd = inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+    if fd < 0:
+        return None
+    return fd, inotify_add_watch
+
+
+class FileWatcher:
+    def __init__(self, paths):
+        self.paths = [os.path.abspath(path) for path in paths]
+        self.fd = None
+        self.watches = {}
+        self.stats = {}
+        inotify = open_inotify()
+        if inotify is not None:
+            self.fd, add_watch = inotify
+            for path in self.paths:
+                directory, name = os.path.split(path)
+                try:
+                    os.makedirs(directory, exist_ok=True)
+                except OSError:
+                    pass
+                wd = add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+                if wd < 0:
+                    self.close()
+                    break
+                self.watches.setdefault(wd, {})[os.fsencode(name)] = path
+        if self.fd is None:
+            for path in self.paths:
+                self.stats[path] = self._stat(path)
+
+    @property
+    def mode(self):
+        return "inotify" if self.fd is not None else "mtime"
+
+    def _stat(self, path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def poll(self):
+        if self.fd is None:
+            return self._poll_stat()
+        changed = set()
+        while True:
+            try:
+                data = os.read(self.fd, READ_SIZE)
+            except BlockingIOError:
+                break
+            except OSError:
+                return changed
+            offset = 0
+            while offset + EVENT_HEADER.size <= len(data):
+                wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset : offset + length].rstrip(b"\0")
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    changed.update(self.paths)
+                    continue
+                path = self.watches.get(wd, {}).get(name)
+                if path is not None:
+                    changed.add(path)
+            if len(data) < READ_SIZE:
+                break
+        return changed
+
+    def _poll_stat(self):
+        changed = set()
+        for path in self.paths:
+            current = self._stat(path)
+            if current != self.stats[path]:
+                self.stats[path] = current
+                changed.add(path)
+        return changed
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None